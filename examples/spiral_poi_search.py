@@ -39,6 +39,8 @@ import pprint
 from pgoapi import PGoApi
 from pgoapi.utilities import f2i, h2f
 from pgoapi import utilities as util
+from pgoapi.scan_planner import plan_scan
+from pgoapi.route_planner import plan_route
 
 from google.protobuf.internal import encoder
 from geopy.geocoders import GoogleV3
@@ -97,6 +99,8 @@ def init_config():
     parser.add_argument("-l", "--location", help="Location", required=required("location"))
     parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
     parser.add_argument("-t", "--test", help="Only parse the specified location", action='store_true')
+    parser.add_argument("-P", "--plan", help="Fetch the cells of the spiral from the fewest positions (set cover scan plan)", action='store_true')
+    parser.add_argument("-S", "--speed", help="Max. movement speed in m/s along the scan plan route", type=float)
     parser.set_defaults(DEBUG=False, TEST=False)
     config = parser.parse_args()
 
@@ -144,6 +148,9 @@ def main():
     # provide player position on the earth
     api.set_position(*position)
 
+    # neighbouring spiral steps share most cells - only fetch what changed since the last visit
+    api.set_map_cache()
+
     if not api.login(config.auth_service, config.username, config.password):
         return
 
@@ -156,22 +163,35 @@ def main():
     # apparently new dict has binary data in it, so formatting it with this method no longer works, pprint works here but there are other alternatives    
     # print('Response dictionary: \n\r{}'.format(json.dumps(response_dict, indent=2)))
     print('Response dictionary: \n\r{}'.format(pprint.PrettyPrinter(indent=4).pformat(response_dict)))
-    find_poi(api, position[0], position[1])
+    find_poi(api, position[0], position[1], config.plan, config.speed)
 
-def find_poi(api, lat, lng):
+def find_poi(api, lat, lng, plan=False, speed=None):
     poi = {'pokemons': {}, 'forts': []}
     step_size = 0.0015
     step_limit = 49
     coords = generate_spiral(lat, lng, step_size, step_limit)
-    for coord in coords:
+    #get_cellid was buggy -> replaced through get_cell_ids from pokecli
+    #timestamp gets computed a different way:
+    steps = [(coord, get_cell_ids(coord['lat'], coord['lng'])) for coord in coords]
+    if plan:
+        # the same cells as the spiral, but each fetched once from the fewest positions
+        scan_plan = plan_scan(set(cell_id for coord, cell_ids in steps for cell_id in cell_ids))
+        log.info('Scan plan: %s (spiral: %s calls)', scan_plan, len(steps))
+        # shortest route through the planned positions, walked at no more than speed m/s
+        route = plan_route(scan_plan.positions, start=(lat, lng), max_speed=speed)
+        log.info('Route: %s', route)
+        steps = [({'lat': position[0], 'lng': position[1]}, scan_plan.cell_ids[index]) for position, index in zip(route.positions, route.order)]
+        coords = [coord for coord, cell_ids in steps]
+        walk = route.walk(api)
+
+    for coord, cell_ids in steps:
         lat = coord['lat']
         lng = coord['lng']
-        api.set_position(lat, lng, 0)
+        if plan:
+            next(walk)
+        else:
+            api.set_position(lat, lng, 0)
 
-        
-        #get_cellid was buggy -> replaced through get_cell_ids from pokecli
-        #timestamp gets computed a different way:
-        cell_ids = get_cell_ids(lat, lng)
         timestamps = [0,] * len(cell_ids)
         response_dict = api.get_map_objects(latitude = util.f2i(lat), longitude = util.f2i(lng), since_timestamp_ms = timestamps, cell_id = cell_ids)
         if (response_dict['responses']):
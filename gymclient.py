@@ -33,6 +33,9 @@ import logging
 import getpass
 import argparse
 import platform
+import threading
+
+from six.moves import queue
 
 # add directory of this file to PATH, so that the package will be found
 sys.path.append(os.path.dirname(os.path.realpath(__file__)))
@@ -40,6 +43,7 @@ sys.path.append(os.path.dirname(os.path.realpath(__file__)))
 # import Pokemon Go API lib
 from pgoapi import pgoapi
 from pgoapi import utilities as util
+from pgoapi.gym_index import GymIndex
 
 
 log = logging.getLogger(__name__)
@@ -98,6 +102,51 @@ def send_map_request(api, position):
         return False
 
 
+def fetch_gym_details(api, gyms, lat, lng, workers, batch_size=pgoapi.DEFAULT_BATCH_SIZE):
+    """
+    fans the GET_GYM_DETAILS calls out over a pool of worker threads and stores the result in fort['gym_details'] -
+    every call chains up to batch_size gyms into one envelope
+    """
+    pending = queue.Queue()
+    for fort in gyms:
+        fort['gym_details'] = None
+    for offset in range(0, len(gyms), batch_size):
+        pending.put(gyms[offset:offset + batch_size])
+
+    progress = {'done': 0}
+    progress_lock = threading.Lock()
+    start = time.time()
+
+    def worker():
+        while True:
+            try:
+                batch = pending.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                details = api.call_batched('get_gym_details', [{'gym_id': fort.get('id'),
+                                                                'player_latitude': lng,
+                                                                'player_longitude': lat,
+                                                                'gym_latitude': fort.get('latitude'),
+                                                                'gym_longitude': fort.get('longitude')} for fort in batch], batch_size)
+                for fort, gym_details in zip(batch, details):
+                    fort['gym_details'] = gym_details
+            except Exception as e:
+                log.warning('Gym details for %s failed: %s', ', '.join(fort.get('id') for fort in batch), e)
+
+            with progress_lock:
+                progress['done'] += len(batch)
+                log.info('Gym details %d/%d (%.1fs)', progress['done'], len(gyms), time.time() - start)
+
+    threads = [threading.Thread(target=worker) for i in range(max(1, min(workers, pending.qsize())))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
 def init_config():
     parser = argparse.ArgumentParser()
     config_file = "config.json"
@@ -118,6 +167,11 @@ def init_config():
     parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
     parser.add_argument("-t", "--test", help="Only parse the specified location", action='store_true')
     parser.add_argument("-o", "--offline", help="Run in offline mode", action='store_true')
+    parser.add_argument("-w", "--workers", help="Parallel gym detail requests", type=int, default=4)
+    parser.add_argument("-b", "--batch_size", help="Gym detail requests per envelope", type=int, default=pgoapi.DEFAULT_BATCH_SIZE)
+    parser.add_argument("-g", "--gym_max_age", help="Seconds after which the details of unchanged gyms are fetched again", type=int, default=21600)
+    parser.add_argument("-r", "--rate", help="Max. requests per second for the account", type=float, default=5.0)
+    parser.add_argument("-c", "--auth_cache", help="File to cache tokens/session tickets in - restarts skip the login")
     parser.set_defaults(DEBUG=False, TEST=False)
     config = parser.parse_args()
 
@@ -178,10 +232,15 @@ def main():
     # set player position on the earth
     api.set_position(*position)
 
+    # pace all calls of the account - gets lowered automatically if the server throttles
+    api.set_rate_limit(config.rate if config.rate > 0 else None)
+
     #if not api.login(config.auth_service, config.username, config.password, app_simulation = True):
     #    return
         
     # new authentication initialitation
+    if config.auth_cache:
+        api.set_auth_cache(config.auth_cache)
     api.set_authentication(provider = config.auth_service, username = config.username, password =  config.password)
 
     # provide the path for your encrypt dll
@@ -225,33 +284,44 @@ def main():
     status = map_objects.get('status', None)
     cells = map_objects['map_cells']
 
-    time.sleep(2);
-    
     #insert detail info about gym to fort
+    gyms = []
     for cell in cells:
         if 'forts' in cell:
             for fort in cell['forts']:
                 print ('id {} type {} points {}'.format(fort.get('id'),fort.get('type'),fort.get('gym_points')))
                 #if fort.get('type') != 1:
                 if 'gym_points' in fort:
-                    req = api.create_request()
-                    req.get_gym_details(gym_id=fort.get('id'),
-                                             player_latitude=lng,
-                                             player_longitude=lat,
-                                             gym_latitude=fort.get('latitude'),
-                                             gym_longitude=fort.get('longitude'))
-                    response_gym_details = req.call()
-                    fort['gym_details'] = response_gym_details.get('responses', {}).get('GET_GYM_DETAILS', None)
-                    if ('name' in fort['gym_details']):
-                        gym_data_cells = os.path.join(gyms_path, "gym_{}.json".format(fort['id']))
-                        with open(gym_data_cells, 'w') as outfile:
-                            json.dump(fort['gym_details'], outfile)
-                    else:
-                        print('***NO GYM DETAILS - HANDLE WHY?');
-                        print('{}'.format(pprint.PrettyPrinter(indent=1).pformat(fort['gym_details'])));
-                        print('{}'.format(pprint.PrettyPrinter(indent=1).pformat(fort)));
-                        print('***NO GYM DETAILS - HANDLE WHY?');
-                    time.sleep(2);
+                    gyms.append(fort)
+
+    # only fetch the details of gyms which changed since the last run (or whose details are older than gym_max_age)
+    gym_index = GymIndex(os.path.join(data_path, "gym_index.json"), config.gym_max_age)
+    changed = []
+    for fort in gyms:
+        gym_data_cells = os.path.join(gyms_path, "gym_{}.json".format(fort['id']))
+        if gym_index.is_changed(fort) or not os.path.isfile(gym_data_cells):
+            changed.append(fort)
+        else:
+            with open(gym_data_cells) as infile:
+                fort['gym_details'] = json.load(infile)
+    log.info('Fetching details of %d changed gyms, %d unchanged', len(changed), len(gyms) - len(changed))
+
+    fetch_gym_details(api, changed, lat, lng, config.workers, config.batch_size)
+
+    for fort in changed:
+        if fort['gym_details'] and ('name' in fort['gym_details']):
+            gym_data_cells = os.path.join(gyms_path, "gym_{}.json".format(fort['id']))
+            with open(gym_data_cells, 'w') as outfile:
+                json.dump(fort['gym_details'], outfile)
+            gym_index.update(fort)
+        else:
+            print('***NO GYM DETAILS - HANDLE WHY?');
+            print('{}'.format(pprint.PrettyPrinter(indent=1).pformat(fort['gym_details'])));
+            print('{}'.format(pprint.PrettyPrinter(indent=1).pformat(fort)));
+            print('***NO GYM DETAILS - HANDLE WHY?');
+
+    gym_index.save()
+
     user_data_cells = os.path.join(data_path, "cells.json")
     with open(user_data_cells, 'w') as outfile:
         outfile.truncate()
@@ -57,6 +57,20 @@ logging.getLogger("utilities").addHandler(logging.NullHandler())
 logging.getLogger("auth").addHandler(logging.NullHandler())
 logging.getLogger("auth_ptc").addHandler(logging.NullHandler())
 logging.getLogger("auth_google").addHandler(logging.NullHandler())
+logging.getLogger("wire_debug").addHandler(logging.NullHandler())
+logging.getLogger("async_http").addHandler(logging.NullHandler())
+logging.getLogger("throttle").addHandler(logging.NullHandler())
+logging.getLogger("account_pool").addHandler(logging.NullHandler())
+logging.getLogger("auth_cache").addHandler(logging.NullHandler())
+logging.getLogger("json_cache").addHandler(logging.NullHandler())
+logging.getLogger("signature").addHandler(logging.NullHandler())
+logging.getLogger("http_pool").addHandler(logging.NullHandler())
+logging.getLogger("endpoint_cache").addHandler(logging.NullHandler())
+logging.getLogger("request_builders").addHandler(logging.NullHandler())
+logging.getLogger("map_cache").addHandler(logging.NullHandler())
+logging.getLogger("gym_index").addHandler(logging.NullHandler())
+logging.getLogger("scan_planner").addHandler(logging.NullHandler())
+logging.getLogger("route_planner").addHandler(logging.NullHandler())
 
 try:
     import requests.packages.urllib3
@@ -0,0 +1,263 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import logging
+import threading
+
+from collections import deque
+from contextlib import contextmanager
+
+from six.moves import queue
+
+from pgoapi.pgoapi import PGoApi
+from pgoapi.utilities import get_time
+from pgoapi.exceptions import AuthException, ServerSideAccessForbiddenException, NoAvailableAccountException
+
+
+class Account:
+
+    """ one logged in PGoApi instance plus its health counters """
+
+    def __init__(self, provider, username, api):
+        self.provider = provider
+        self.username = username
+        self.api = api
+
+        self.last_used = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.evicted = None
+
+    def is_healthy(self):
+        return self.evicted is None
+
+    def get_ticket_expire(self):
+        """ session ticket expiry in ms or None """
+        auth_provider = self.api.get_auth_provider()
+        if auth_provider is None or not auth_provider.has_ticket():
+            return None
+        ticket = auth_provider.get_ticket()
+        return ticket[0] if ticket else None
+
+    def __repr__(self):
+        return '<Account {}:{}>'.format(self.provider, self.username)
+
+
+class AccountPool:
+
+    """
+    Hands out logged in accounts to scan workers, least recently used first, so the scan
+    throughput scales with the number of accounts while each account keeps its own rate limit.
+    Accounts which get banned (ServerSideAccessForbiddenException) or fail max_failures times
+    in a row are evicted from the pool.
+    """
+
+    def __init__(self, position=None, signature_lib=None, rate=None, max_failures=5, auth_cache=None, endpoint_cache=None, api_class=PGoApi):
+        self.log = logging.getLogger(__name__)
+
+        self._position = position
+        self._signature_lib = signature_lib
+        self._rate = rate
+        self._max_failures = max_failures
+        self._auth_cache = auth_cache
+        self._endpoint_cache = endpoint_cache
+        self._api_class = api_class
+
+        self._lock = threading.Condition()
+        self._accounts = []
+        self._idle = deque()
+
+    def __len__(self):
+        return len(self.get_accounts())
+
+    def create_api(self):
+        api = self._api_class()
+        if self._position is not None:
+            api.set_position(*self._position)
+        if self._signature_lib is not None:
+            api.activate_signature(self._signature_lib)
+        if self._rate is not None:
+            api.set_rate_limit(self._rate)
+        if self._auth_cache is not None:
+            api.set_auth_cache(self._auth_cache)
+        if self._endpoint_cache is not None:
+            api.set_endpoint_cache(self._endpoint_cache)
+        return api
+
+    def add_account(self, provider, username, password=None, oauth2_refresh_token=None, api=None):
+        """ logs the account in (raises AuthException on failure) and adds it to the pool """
+        if api is None:
+            api = self.create_api()
+            api.set_authentication(provider, oauth2_refresh_token, username, password)
+
+        account = Account(provider, username, api)
+        with self._lock:
+            self._accounts.append(account)
+            self._idle.append(account)
+            self._lock.notify()
+
+        self.log.info('Added account %s to the pool', username)
+        return account
+
+    def add_accounts(self, accounts, workers=4):
+        """
+        Logs in a list of (provider, username, password) tuples with a pool of threads.
+        Returns the list of accounts which failed to log in.
+        """
+        pending = queue.Queue()
+        for account in accounts:
+            pending.put(account)
+
+        failed = []
+
+        def worker():
+            while True:
+                try:
+                    provider, username, password = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    self.add_account(provider, username, password)
+                except AuthException as e:
+                    self.log.error('Login of %s failed: %s', username, e)
+                    failed.append((provider, username, password))
+
+        threads = [threading.Thread(target=worker) for i in range(max(1, min(workers, len(accounts))))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return failed
+
+    def get_accounts(self):
+        with self._lock:
+            return [account for account in self._accounts if account.is_healthy()]
+
+    def acquire(self, timeout=None):
+        """ returns the least recently used idle account, waits up to timeout seconds for one to be released """
+        end = None if timeout is None else time.time() + timeout
+        with self._lock:
+            while not self._idle:
+                if not any(account.is_healthy() for account in self._accounts):
+                    raise NoAvailableAccountException('No healthy account left in the pool')
+
+                remaining = None if end is None else end - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise NoAvailableAccountException('No account released within {}s'.format(timeout))
+                self._lock.wait(remaining)
+
+            account = self._idle.popleft()
+            account.last_used = time.time()
+            account.calls += 1
+            return account
+
+    def release(self, account, error=None):
+        """ gives the account back to the pool - error is the exception of a failed call or None """
+        with self._lock:
+            if error is None:
+                account.consecutive_failures = 0
+            else:
+                account.failures += 1
+                account.consecutive_failures += 1
+
+                if isinstance(error, ServerSideAccessForbiddenException):
+                    self._evict(account, 'access forbidden')
+                elif account.consecutive_failures >= self._max_failures:
+                    self._evict(account, '{} failed calls in a row'.format(account.consecutive_failures))
+
+            if account.is_healthy():
+                self._idle.append(account)
+
+            """ waiters have to be woken up on evictions too, the pool might be exhausted now """
+            self._lock.notify_all()
+
+    def evict(self, account, reason):
+        with self._lock:
+            self._evict(account, reason)
+            if account in self._idle:
+                self._idle.remove(account)
+            self._lock.notify_all()
+
+    def _evict(self, account, reason):
+        if account.evicted is None:
+            self.log.warning('Evicting account %s from the pool: %s', account.username, reason)
+            account.evicted = reason
+
+    @contextmanager
+    def session(self, timeout=None):
+        """
+        with pool.session() as api:
+            api.get_player()
+        """
+        account = self.acquire(timeout)
+        try:
+            yield account.api
+        except Exception as e:
+            self.release(account, e)
+            raise
+        else:
+            self.release(account)
+
+    def refresh_tickets(self, margin=300):
+        """
+        Keeps the session tickets warm: idle accounts without a ticket or whose ticket expires
+        within margin seconds do a GET_PLAYER call to receive a new one.
+        """
+        threshold = get_time(ms=True) + margin * 1000
+
+        with self._lock:
+            stale = [account for account in self._idle if (account.get_ticket_expire() or 0) < threshold]
+            for account in stale:
+                self._idle.remove(account)
+
+        for account in stale:
+            error = None
+            try:
+                if not account.api.get_player():
+                    error = Exception('Empty response')
+            except Exception as e:
+                self.log.info('Ticket refresh of %s failed: %s', account.username, e)
+                error = e
+
+            account.last_used = time.time()
+            self.release(account, error)
+
+        return len(stale)
+
+    def get_stats(self):
+        with self._lock:
+            return [{'username': account.username,
+                     'provider': account.provider,
+                     'calls': account.calls,
+                     'failures': account.failures,
+                     'idle': account in self._idle,
+                     'evicted': account.evicted,
+                     'ticket_expire': account.get_ticket_expire()} for account in self._accounts]
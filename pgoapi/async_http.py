@@ -0,0 +1,169 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import ssl
+import asyncio
+import logging
+
+from urllib.parse import urlparse
+
+"""
+Minimal asyncio HTTP/1.1 client for the RPC endpoint: POST requests only, keep-alive
+connections per host, Content-Length and chunked response bodies. Python 3 only.
+"""
+
+
+class AsyncHttpResponse:
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+
+class AsyncHttpSession:
+
+    def __init__(self, headers=None, verify=True, limit_per_host=100):
+        self.log = logging.getLogger(__name__)
+
+        self.headers = dict(headers or {})
+        self.verify = verify
+
+        self._limit_per_host = limit_per_host
+        self._semaphores = {}
+        self._idle = {}
+        self._ssl_context = None
+
+    def _get_ssl_context(self):
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+            if not self.verify:
+                self._ssl_context.check_hostname = False
+                self._ssl_context.verify_mode = ssl.CERT_NONE
+        return self._ssl_context
+
+    async def post(self, url, data=b'', timeout=30):
+        url = urlparse(url)
+        https = url.scheme == 'https'
+        host = url.hostname
+        port = url.port or (443 if https else 80)
+        path = url.path or '/'
+        if url.query:
+            path += '?' + url.query
+
+        key = (https, host, port)
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores[key] = asyncio.Semaphore(self._limit_per_host)
+
+        async with semaphore:
+            return await asyncio.wait_for(self._post(key, url.netloc, path, data), timeout)
+
+    async def _connect(self, key):
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof():
+                return (reader, writer), True
+            writer.close()
+
+        https, host, port = key
+        self.log.debug('Opening new connection to %s:%s', host, port)
+        connection = await asyncio.open_connection(host, port, ssl=self._get_ssl_context() if https else None)
+        return connection, False
+
+    async def _post(self, key, host, path, data):
+        while True:
+            connection, reused = await self._connect(key)
+            try:
+                response, keep_alive = await self._send(connection, host, path, data)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection[1].close()
+                if reused:
+                    """ stale keep-alive connection - retry with the next one """
+                    continue
+                raise
+            except BaseException:
+                connection[1].close()
+                raise
+
+            if keep_alive:
+                self._idle.setdefault(key, []).append(connection)
+            else:
+                connection[1].close()
+
+            return response
+
+    async def _send(self, connection, host, path, data):
+        reader, writer = connection
+
+        lines = ['POST {} HTTP/1.1'.format(path),
+                 'Host: {}'.format(host),
+                 'Content-Length: {}'.format(len(data)),
+                 'Connection: keep-alive']
+        for name, value in self.headers.items():
+            lines.append('{}: {}'.format(name, value))
+
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed by server')
+        version, status_code = status_line.decode('latin-1').split(None, 2)[:2]
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0].strip(), 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            content = b''.join(chunks)
+        elif 'content-length' in headers:
+            content = await reader.readexactly(int(headers['content-length']))
+        else:
+            content = await reader.read()
+            keep_alive = False
+
+        return AsyncHttpResponse(int(status_code), headers, content), keep_alive
+
+    async def close(self):
+        for connections in self._idle.values():
+            for reader, writer in connections:
+                writer.close()
+        self._idle = {}
@@ -34,9 +34,14 @@ class Auth:
         self.log = logging.getLogger(__name__)
 
         self._auth_provider = None
+        self._username = None
 
         self._login = False
 
+        """ optional AuthCache - persists tokens and tickets of this account across restarts """
+        self._auth_cache = None
+        self._state_changed = False
+
         """ 
         oauth2 uses refresh tokens (which basically never expires) 
         to get an access_token which is only valid for a certain time)
@@ -58,6 +63,64 @@ class Auth:
     def get_name(self):
         return self._auth_provider
 
+    def get_username(self):
+        return self._username
+
+    def set_auth_cache(self, auth_cache):
+        self._auth_cache = auth_cache
+
+    def get_state(self):
+        return {'refresh_token': self._refresh_token,
+                'access_token': self._access_token,
+                'access_token_expiry': self._access_token_expiry,
+                'ticket': [self._ticket_expire, self._ticket_start, self._ticket_end] if self.has_ticket() else None}
+
+    def set_state(self, state):
+        self._refresh_token = state.get('refresh_token')
+        self._access_token = state.get('access_token')
+        self._access_token_expiry = state.get('access_token_expiry', 0)
+        if state.get('ticket'):
+            self._ticket_expire, self._ticket_start, self._ticket_end = state['ticket']
+
+    def restore_login(self, username):
+        """
+        Restores the credentials of username from the auth cache. Returns True if they are
+        still usable without a new user login (valid ticket or access token / refresh token).
+        """
+        if self._auth_cache is None:
+            return False
+
+        state = self._auth_cache.load(self._auth_provider, username)
+        if not state:
+            return False
+
+        self._username = username
+        self.set_state(state)
+
+        if self.check_ticket() or self.check_access_token():
+            self.log.info('Restored %s login of %s from the auth cache', self._auth_provider, username)
+            self._login = True
+            return True
+
+        if self._refresh_token is not None:
+            self.log.info('Restored %s refresh token of %s from the auth cache', self._auth_provider, username)
+            try:
+                self.get_access_token()
+            except Exception as e:
+                self.log.info('Cached refresh token of %s not accepted: %s', username, e)
+                return False
+            return self._login
+
+        return False
+
+    def _store_state(self):
+        self._state_changed = False
+        if self._auth_cache is not None and self._username is not None:
+            try:
+                self._auth_cache.store(self._auth_provider, self._username, self.get_state())
+            except (IOError, OSError) as e:
+                self.log.warning('Could not write auth cache: %s', e)
+
     def is_login(self):
         return self._login
 
@@ -71,7 +134,17 @@ class Auth:
             return False
 
     def set_ticket(self, params):
+        """ called while the response gets processed - the auth cache gets written by flush_state() """
         self._ticket_expire, self._ticket_start, self._ticket_end = params
+        self._state_changed = self._auth_cache is not None
+
+    def is_state_changed(self):
+        return self._state_changed
+
+    def flush_state(self):
+        """ writes a ticket received since the last write to the auth cache """
+        if self._state_changed:
+            self._store_state()
 
     def is_new_ticket(self, new_ticket_time_ms):
         if self._ticket_expire is None or new_ticket_time_ms > self._ticket_expire:
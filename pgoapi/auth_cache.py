@@ -0,0 +1,60 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import base64
+
+from pgoapi.json_cache import JsonFileCache
+
+"""
+On-disk cache for the credentials of Auth providers, keyed by provider:username. It holds the
+oauth2 refresh token, the access token with its expiry and the session ticket - a restart within
+their validity skips the complete login flow. Several worker processes can share one cache file.
+"""
+
+
+class AuthCache(JsonFileCache):
+
+    def load(self, provider, username):
+        """ returns the cached state of the account (see Auth.get_state) or None """
+        state = self.get_entry(provider, username)
+        if not state:
+            return None
+
+        ticket = state.get('ticket')
+        if ticket:
+            state['ticket'] = [ticket[0], base64.b64decode(ticket[1]), base64.b64decode(ticket[2])]
+        return state
+
+    def store(self, provider, username, state):
+        state = dict(state)
+
+        ticket = state.get('ticket')
+        if ticket:
+            state['ticket'] = [ticket[0], base64.b64encode(ticket[1]).decode('ascii'), base64.b64encode(ticket[2]).decode('ascii')]
+
+        self.set_entry(provider, username, state)
+        self.log.debug('Stored credentials of %s:%s in the auth cache', provider, username)
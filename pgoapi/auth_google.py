@@ -52,6 +52,8 @@ class AuthGoogle(Auth):
         if not isinstance(username, six.string_types) or not isinstance(password, six.string_types):
             raise AuthException("Username/password not correctly specified")
 
+        self._username = username
+
         user_login = perform_master_login(username, password, self.GOOGLE_LOGIN_ANDROID_ID)
 
         refresh_token = user_login.get('Token', None)
@@ -91,6 +93,7 @@ class AuthGoogle(Auth):
 
                 self.log.info('Google Access Token successfully received.')
                 self.log.debug('Google Access Token: %s...', self._access_token[:25])
+                self._store_state()
                 return self._access_token
             else:
                 self._access_token = None
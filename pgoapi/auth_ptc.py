@@ -58,7 +58,9 @@ class AuthPtc(Auth):
 
         if not isinstance(username, six.string_types) or not isinstance(password, six.string_types):
             raise AuthException("Username/password not correctly specified")
-        
+
+        self._username = username
+
         head = {'User-Agent': 'niantic'}
         r = self._session.get(self.PTC_LOGIN_URL, headers=head)
 
@@ -139,6 +141,8 @@ class AuthPtc(Auth):
 
                 self.log.info('PTC Access Token successfully retrieved.')
                 self.log.debug('PTC Access Token: %s...', self._access_token[:25])
+                self._store_state()
+                return self._access_token
             else:
                 self._access_token = None
                 self._login = False
@@ -0,0 +1,96 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+
+from __future__ import absolute_import
+
+import logging
+import threading
+
+from pgoapi.utilities import get_time
+from pgoapi.json_cache import JsonFileCache
+
+"""
+Remembers the API endpoint (api_url of a status 53 redirect) per account, so new PGoApi
+instances of the same account start at the right endpoint instead of paying a redirect
+round trip first. By default all PGoApi instances of a process share one in-memory cache,
+with a path the endpoints are also persisted in a JsonFileCache.
+"""
+
+
+class EndpointCache:
+
+    def __init__(self, path=None):
+        self.log = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._file = JsonFileCache(path) if path is not None else None
+
+    def get(self, provider, username):
+        key = JsonFileCache.get_key(provider, username)
+
+        with self._lock:
+            api_endpoint = self._endpoints.get(key)
+        if api_endpoint is not None or self._file is None:
+            return api_endpoint
+
+        entry = self._file.get_entry(provider, username)
+        if not entry:
+            return None
+
+        api_endpoint = entry.get('api_endpoint')
+        with self._lock:
+            self._endpoints[key] = api_endpoint
+        return api_endpoint
+
+    def set(self, provider, username, api_endpoint):
+        key = JsonFileCache.get_key(provider, username)
+
+        with self._lock:
+            if self._endpoints.get(key) == api_endpoint:
+                return
+            self._endpoints[key] = api_endpoint
+
+        self.log.debug('Remember API endpoint %s for %s', api_endpoint, key)
+
+        if self._file is not None:
+            try:
+                self._file.set_entry(provider, username, {'api_endpoint': api_endpoint, 'timestamp_ms': get_time(ms=True)})
+            except (IOError, OSError) as e:
+                self.log.warning('Could not write endpoint cache: %s', e)
+
+    def remove(self, provider, username):
+        with self._lock:
+            self._endpoints.pop(JsonFileCache.get_key(provider, username), None)
+        if self._file is not None:
+            self._file.remove(provider, username)
+
+
+_default_cache = EndpointCache()
+
+
+def get_default_endpoint_cache():
+    return _default_cache
@@ -32,6 +32,9 @@ class NotLoggedInException(Exception):
 class ServerBusyOrOfflineException(Exception):
     pass
 
+class ServerOverloadedException(ServerBusyOrOfflineException):
+    pass
+
 class PleaseInstallProtobufVersion3(Exception):
     pass
 
@@ -47,12 +50,18 @@ class ServerSideRequestThrottlingException(Exception):
 class ServerSideAccessForbiddenException(Exception):
     pass
 
+class NoAvailableAccountException(Exception):
+    pass
+
 class UnexpectedResponseException(Exception):
     pass
 
 class AuthTokenExpiredException(Exception):
     pass
 
+class SignatureLibraryException(Exception):
+    pass
+
 class ServerApiEndpointRedirectException(Exception):
     def __init__(self):
         self._api_endpoint = None
@@ -0,0 +1,118 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import zlib
+import logging
+import threading
+
+from pgoapi.json_cache import JsonFileCache
+
+"""
+Change detection for gyms: FortData of GET_MAP_OBJECTS already carries the state a gym detail
+call would be made for (last modification, prestige, team and guard). The index keeps a
+fingerprint of the last FortData a gym's details were fetched for - details only have to be
+fetched again if the fingerprint changed or the last fetch is older than max_age seconds (shortened
+by up to max_age_jitter per gym, so gyms fetched in the same run do not all expire in the same run).
+With a path the index is persisted in a JsonFileCache.
+"""
+
+FINGERPRINT_FIELDS = ('last_modified_timestamp_ms', 'gym_points', 'owned_by_team', 'guard_pokemon_id')
+
+
+def get_fingerprint(fort):
+    """ fingerprint of a FortData dict (protobuf_to_dict format) """
+    return [fort.get(field, 0) for field in FINGERPRINT_FIELDS]
+
+
+class GymIndex:
+
+    def __init__(self, path=None, max_age=21600, max_age_jitter=0.25):
+        self.log = logging.getLogger(__name__)
+
+        self.max_age = max_age
+        self.max_age_jitter = max_age_jitter
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = {}
+
+        self._file = JsonFileCache(path) if path is not None else None
+        if self._file is not None:
+            self._entries = self._file.get_entries()
+            self.log.debug('Loaded %s gyms from %s', len(self._entries), path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_changed(self, fort, now=None):
+        """ True if the details of the gym have to be fetched (unknown, changed or older than max_age) """
+        with self._lock:
+            entry = self._entries.get(fort.get('id'))
+        if entry is None or entry.get('fingerprint') != get_fingerprint(fort):
+            return True
+        if self.max_age is None:
+            return False
+        if now is None:
+            now = time.time()
+        return now - entry.get('fetched', 0) >= self.get_max_age(fort.get('id'))
+
+    def get_max_age(self, gym_id):
+        """ max_age of the gym - the jitter is derived from the gym id, so it is stable across runs """
+        spread = (zlib.crc32(str(gym_id).encode('utf-8')) & 0xffff) / 65536.0
+        return self.max_age * (1.0 - self.max_age_jitter * spread)
+
+    def get_changed(self, forts):
+        """ the forts of which the details have to be fetched """
+        now = time.time()
+        return [fort for fort in forts if self.is_changed(fort, now)]
+
+    def update(self, fort, fetched=None):
+        """ records that the details of the gym were fetched for its current FortData """
+        entry = {'fingerprint': get_fingerprint(fort), 'fetched': time.time() if fetched is None else fetched}
+        with self._lock:
+            self._entries[fort.get('id')] = entry
+            self._dirty[fort.get('id')] = entry
+
+    def save(self):
+        """ writes the gyms updated since the last save to the index file """
+        if self._file is None:
+            return
+
+        with self._lock:
+            dirty = self._dirty
+            self._dirty = {}
+        if not dirty:
+            return
+
+        try:
+            self._file.update_entries(dirty)
+        except (IOError, OSError) as e:
+            self.log.warning('Could not write gym index: %s', e)
+            with self._lock:
+                dirty.update(self._dirty)
+                self._dirty = dirty
@@ -0,0 +1,166 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import logging
+import threading
+import requests
+
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.connection import HTTPConnection, HTTPSConnection
+from requests.packages.urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+"""
+Process wide HTTP connection pool for the RPC endpoint. Every PGoApi gets its own
+requests session (cookies stay per account), but all sessions share one adapter - so
+keep-alive connections to a host are reused by all requests and accounts of the process,
+also after an endpoint redirect.
+"""
+
+log = logging.getLogger(__name__)
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 100
+
+
+class PoolStats:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._requests = 0
+            self._connects = 0
+            self._connect_time = 0.0
+
+    def request(self):
+        with self._lock:
+            self._requests += 1
+
+    def connected(self, seconds):
+        with self._lock:
+            self._connects += 1
+            self._connect_time += seconds
+
+    def get(self):
+        """ pool hits are requests sent over an already open connection """
+        with self._lock:
+            return {'requests': self._requests,
+                    'hits': max(0, self._requests - self._connects),
+                    'misses': self._connects,
+                    'connect_time': self._connect_time,
+                    'avg_connect_time': self._connect_time / self._connects if self._connects else 0.0}
+
+
+_stats = PoolStats()
+
+
+class StatsHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.time()
+        HTTPConnection.connect(self)
+        _stats.connected(time.time() - start)
+
+
+class StatsHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.time()
+        HTTPSConnection.connect(self)
+        _stats.connected(time.time() - start)
+
+
+class StatsHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = StatsHTTPConnection
+
+    def _get_conn(self, timeout=None):
+        _stats.request()
+        return HTTPConnectionPool._get_conn(self, timeout)
+
+
+class StatsHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = StatsHTTPSConnection
+
+    def _get_conn(self, timeout=None):
+        _stats.request()
+        return HTTPSConnectionPool._get_conn(self, timeout)
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+
+    """
+    pool_connections: number of hosts to keep pools for (redirected endpoints get their own pool)
+    pool_maxsize: keep-alive connections per host - should be >= the number of worker threads
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        HTTPAdapter.init_poolmanager(self, *args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': StatsHTTPConnectionPool, 'https': StatsHTTPSConnectionPool}
+
+
+_adapter = None
+_adapter_lock = threading.Lock()
+
+
+def configure_pool(pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False):
+    """ (re)creates the shared adapter - affects sessions created afterwards """
+    global _adapter
+    with _adapter_lock:
+        _adapter = PooledHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    log.debug('HTTP pool configured: %s hosts, %s connections per host', pool_connections, pool_maxsize)
+    return _adapter
+
+
+def get_adapter():
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = PooledHTTPAdapter(pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE)
+    return _adapter
+
+
+def create_session():
+    """ new session on the shared adapter - do not close() it, that would close the shared pools """
+    session = requests.session()
+    session.headers.update({'User-Agent': 'Niantic App'})
+    session.verify = True
+
+    adapter = get_adapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_pool_stats():
+    """ requests, pool hits/misses and the time spent in (TCP + TLS) connects of all sessions """
+    return _stats.get()
+
+
+def reset_pool_stats():
+    _stats.reset()
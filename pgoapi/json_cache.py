@@ -0,0 +1,130 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import json
+import logging
+import threading
+
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+"""
+JSON object file with entries per provider:username, the storage of AuthCache, EndpointCache
+and GymIndex. The file is guarded by an flock()ed lock file and replaced atomically, so several
+worker processes can share one cache file (without fcntl, e.g. on Windows, only threads of the
+same process are synchronized).
+"""
+
+
+class JsonFileCache:
+
+    """ JSON object file with entries per provider:username, shared by processes """
+
+    def __init__(self, path):
+        self.log = logging.getLogger(__name__)
+
+        self._path = path
+        self._lock_path = path + '.lock'
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(provider, username):
+        return '{}:{}'.format(provider, username)
+
+    def get_path(self):
+        return self._path
+
+    @contextmanager
+    def _locked(self, exclusive):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+
+            fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def _read(self):
+        try:
+            with open(self._path, 'r') as f:
+                return json.load(f)
+        except (IOError, OSError):
+            return {}
+        except ValueError as e:
+            self.log.warning('Ignoring corrupt cache file %s: %s', self._path, e)
+            return {}
+
+    def _write(self, entries):
+        tmp_path = '{}.{}.tmp'.format(self._path, os.getpid())
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+
+        if hasattr(os, 'replace'):
+            os.replace(tmp_path, self._path)
+        else:
+            """ Python 2 - rename() does not overwrite on Windows """
+            if os.path.exists(self._path) and os.name == 'nt':
+                os.remove(self._path)
+            os.rename(tmp_path, self._path)
+
+    def get_entry(self, provider, username):
+        with self._locked(False):
+            return self._read().get(self.get_key(provider, username))
+
+    def set_entry(self, provider, username, entry):
+        with self._locked(True):
+            entries = self._read()
+            entries[self.get_key(provider, username)] = entry
+            self._write(entries)
+
+    def get_entries(self):
+        with self._locked(False):
+            return self._read()
+
+    def update_entries(self, entries):
+        """ merges entries (by key) into the file with one read and write """
+        with self._locked(True):
+            merged = self._read()
+            merged.update(entries)
+            self._write(merged)
+
+    def remove(self, provider, username):
+        with self._locked(True):
+            entries = self._read()
+            if entries.pop(self.get_key(provider, username), None) is not None:
+                self._write(entries)
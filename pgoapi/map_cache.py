@@ -0,0 +1,170 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import logging
+import threading
+
+from collections import OrderedDict
+
+from pgoapi.rpc_api import get_sub_responses
+
+from . import protos
+from POGOProtos.Networking.Requests_pb2 import RequestType
+
+"""
+Incremental GET_MAP_OBJECTS: the cache remembers the current_timestamp_ms of every map cell and
+sends it as since_timestamp_ms of the next request for the cell, so the server only returns what
+changed since then. The returned deltas are merged into the cached cells and the response gets the
+complete merged cells - callers see the same map_cells as with a full request.
+Forts, fort summaries and spawn points are merged by id/position (deleted_objects are removed),
+the pokemon lists are short-lived and replaced by the latest ones of each cell (emptied if
+a requested cell is missing in the response).
+"""
+
+GET_MAP_OBJECTS = RequestType.Value('GET_MAP_OBJECTS')
+
+KEYED_FIELDS = (('forts', lambda fort: fort.get('id')),
+                ('fort_summaries', lambda summary: summary.get('fort_summary_id')),
+                ('spawn_points', lambda point: (point.get('latitude'), point.get('longitude'))),
+                ('decimated_spawn_points', lambda point: (point.get('latitude'), point.get('longitude'))))
+
+TRANSIENT_FIELDS = ('wild_pokemons', 'catchable_pokemons', 'nearby_pokemons')
+
+
+class MapCellCache:
+
+    def __init__(self, max_cells=10000):
+        self.log = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._cells = OrderedDict()
+        self._max_cells = max_cells
+
+    def __len__(self):
+        return len(self._cells)
+
+    def get_timestamps(self, cell_ids):
+        """ since_timestamp_ms values for cell_ids - 0 (everything) for unknown cells """
+        with self._lock:
+            cells = self._cells
+            return [cells[cell_id]['current_timestamp_ms'] if cell_id in cells else 0 for cell_id in cell_ids]
+
+    def get_cells(self, cell_ids):
+        """ merged map cells (in protobuf_to_dict format) of the known cells of cell_ids """
+        with self._lock:
+            return [self._export(self._cells[cell_id]) for cell_id in cell_ids if cell_id in self._cells]
+
+    def clear(self):
+        with self._lock:
+            self._cells.clear()
+
+    def prepare(self, subrequests):
+        """
+        Fills in since_timestamp_ms of the GET_MAP_OBJECTS calls in a request chain - unless the caller
+        passed own (non zero) timestamps. Returns the requested cell ids of every GET_MAP_OBJECTS call.
+        """
+        requested = []
+        for entry in subrequests:
+            if isinstance(entry, dict) and GET_MAP_OBJECTS in entry:
+                kwargs = entry[GET_MAP_OBJECTS]
+                cell_ids = kwargs.get('cell_id')
+                if not isinstance(cell_ids, list):
+                    requested.append(None)
+                    continue
+
+                since = kwargs.get('since_timestamp_ms')
+                if since is None or (isinstance(since, list) and not any(since)):
+                    kwargs['since_timestamp_ms'] = self.get_timestamps(cell_ids)
+                requested.append(cell_ids)
+
+            elif entry == GET_MAP_OBJECTS:
+                requested.append(None)
+
+        return requested
+
+    def merge(self, response, requested):
+        """ merges the GET_MAP_OBJECTS deltas of a response dict and replaces its map_cells with the merged cells """
+        for map_objects, cell_ids in zip(get_sub_responses(response, 'GET_MAP_OBJECTS'), requested):
+            if not isinstance(map_objects, dict) or map_objects.get('status') != 1:
+                continue
+
+            map_cells = map_objects.get('map_cells', [])
+            if cell_ids is None:
+                cell_ids = [cell.get('s2_cell_id') for cell in map_cells]
+
+            with self._lock:
+                for cell in map_cells:
+                    self._merge_cell(cell)
+
+                """ requested cells without an answer have no current pokemons - do not export old ones """
+                answered = set(cell.get('s2_cell_id') for cell in map_cells)
+                for cell_id in cell_ids:
+                    if cell_id not in answered and cell_id in self._cells:
+                        for field in TRANSIENT_FIELDS:
+                            self._cells[cell_id][field] = []
+
+                map_objects['map_cells'] = [self._export(self._cells[cell_id]) for cell_id in cell_ids if cell_id in self._cells]
+
+    def _merge_cell(self, cell):
+        cell_id = cell.get('s2_cell_id')
+        cached = self._cells.pop(cell_id, None)
+        if cached is None:
+            cached = {'s2_cell_id': cell_id, 'current_timestamp_ms': 0}
+            for field, key in KEYED_FIELDS:
+                cached[field] = OrderedDict()
+        self._cells[cell_id] = cached
+
+        deleted = cell.get('deleted_objects')
+        if deleted:
+            for field, key in KEYED_FIELDS:
+                for object_id in deleted:
+                    cached[field].pop(object_id, None)
+
+        for field, key in KEYED_FIELDS:
+            for item in cell.get(field, ()):
+                cached[field][key(item)] = item
+
+        for field in TRANSIENT_FIELDS:
+            cached[field] = cell.get(field, [])
+
+        """ a truncated cell has to be requested again from the old timestamp """
+        if not cell.get('is_truncated_list'):
+            cached['current_timestamp_ms'] = max(cached['current_timestamp_ms'], cell.get('current_timestamp_ms', 0))
+
+        while len(self._cells) > self._max_cells:
+            self._cells.popitem(last=False)
+
+    @staticmethod
+    def _export(cached):
+        cell = {'s2_cell_id': cached['s2_cell_id'], 'current_timestamp_ms': cached['current_timestamp_ms']}
+        for field, key in KEYED_FIELDS:
+            if cached[field]:
+                cell[field] = [dict(item) for item in cached[field].values()]
+        for field in TRANSIENT_FIELDS:
+            if cached[field]:
+                cell[field] = [dict(item) for item in cached[field]]
+        return cell
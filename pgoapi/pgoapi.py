@@ -28,20 +28,29 @@ from __future__ import absolute_import
 import re
 import six
 import logging
-import requests
+import threading
 
 from . import __title__, __version__, __copyright__
-from pgoapi.rpc_api import RpcApi
+from pgoapi.rpc_api import RpcApi, get_sub_responses
 from pgoapi.auth_ptc import AuthPtc
 from pgoapi.auth_google import AuthGoogle
+from pgoapi.wire_debug import WireDebug
+from pgoapi.throttle import RateGovernor
+from pgoapi.auth_cache import AuthCache
+from pgoapi.http_pool import create_session, get_pool_stats
+from pgoapi.endpoint_cache import EndpointCache, get_default_endpoint_cache
+from pgoapi.map_cache import MapCellCache
 from pgoapi.utilities import parse_api_endpoint
-from pgoapi.exceptions import AuthException, NotLoggedInException, ServerBusyOrOfflineException, NoPlayerPositionSetException, EmptySubrequestChainException, AuthTokenExpiredException, ServerApiEndpointRedirectException, UnexpectedResponseException
+from pgoapi.exceptions import AuthException, NotLoggedInException, ServerBusyOrOfflineException, ServerOverloadedException, NoPlayerPositionSetException, EmptySubrequestChainException, AuthTokenExpiredException, ServerApiEndpointRedirectException, UnexpectedResponseException, ServerSideRequestThrottlingException
 
 from . import protos
 from POGOProtos.Networking.Requests_pb2 import RequestType
 
 logger = logging.getLogger(__name__)
 
+""" sub requests per envelope of PGoApi.call_batched """
+DEFAULT_BATCH_SIZE = 10
+
 
 class PGoApi:
 
@@ -50,8 +59,13 @@ class PGoApi:
         self.log.info('%s v%s - %s', __title__, __version__, __copyright__)
 
         self._auth_provider = None
-        if provider is not None and ((username is not None and password is not None) or (oauth2_refresh_token is not None)):
-            self.set_authentication(provider, oauth2_refresh_token, username, password)
+        self._auth_cache = None
+        self._endpoint_cache = get_default_endpoint_cache()
+        self._map_cache = None
+
+        """ long-lived RpcApi instances by proxy - see get_rpc_api """
+        self._rpc_apis = {}
+        self._rpc_apis_lock = threading.Lock()
 
         self.set_api_endpoint("pgorelease.nianticlabs.com/plfe")
         self._proxy = None
@@ -62,9 +76,17 @@ class PGoApi:
 
         self._signature_lib = None
 
-        self._session = requests.session()
-        self._session.headers.update({'User-Agent': 'Niantic App'})
-        self._session.verify = True
+        self._wire_debug = None
+
+        """ unlimited until the server throttles - see set_rate_limit """
+        self._rate_governor = RateGovernor()
+        self._max_throttle_retries = 3
+
+        self._session = self.create_http_session()
+
+        """ last, the cached API endpoint of the account has to override the default endpoint """
+        if provider is not None and ((username is not None and password is not None) or (oauth2_refresh_token is not None)):
+            self.set_authentication(provider, oauth2_refresh_token, username, password)
 
     def set_logger(self, logger=None):
         self.log = logger or logging.getLogger(__name__)
@@ -81,13 +103,72 @@ class PGoApi:
 
         self.log.debug('Auth provider: %s', provider)
 
+        self._reset_rpc_apis()
+
+        if self._auth_provider is not None:
+            self._auth_provider.set_auth_cache(self._auth_cache)
+
         if oauth2_refresh_token is not None:
             self._auth_provider.set_refresh_token(oauth2_refresh_token)
         elif username is not None and password is not None:
-            self._auth_provider.user_login(username, password)
+            if not self._auth_provider.restore_login(username):
+                self._auth_provider.user_login(username, password)
         else:
             raise AuthException("Invalid Credential Input - Please provide username/password or an oauth2 refresh token")
 
+        """ start at the endpoint the server redirected this account to before """
+        if self._endpoint_cache is not None and username is not None:
+            api_endpoint = self._endpoint_cache.get(provider, username)
+            if api_endpoint is not None:
+                self.log.debug('Using cached API endpoint %s', api_endpoint)
+                self.set_api_endpoint(api_endpoint)
+
+    def set_auth_cache(self, auth_cache):
+        """
+        Persists tokens and session tickets (AuthCache or path of the cache file) - a following
+        set_authentication() of a cached account skips the login flow while they are valid.
+        Has to be called before set_authentication().
+        """
+        if isinstance(auth_cache, six.string_types):
+            auth_cache = AuthCache(auth_cache)
+        self._auth_cache = auth_cache
+        if self._auth_provider is not None:
+            self._auth_provider.set_auth_cache(auth_cache)
+
+    def get_auth_cache(self):
+        return self._auth_cache
+
+    def set_endpoint_cache(self, endpoint_cache):
+        """ EndpointCache, path of a cache file or None (disable) - has to be called before set_authentication() """
+        if isinstance(endpoint_cache, six.string_types):
+            endpoint_cache = EndpointCache(endpoint_cache)
+        self._endpoint_cache = endpoint_cache
+
+    def get_endpoint_cache(self):
+        return self._endpoint_cache
+
+    def remember_api_endpoint(self):
+        """ stores the current API endpoint in the endpoint cache (called after redirects) """
+        if self._endpoint_cache is None or self._auth_provider is None:
+            return
+
+        username = self._auth_provider.get_username()
+        if username is not None:
+            self._endpoint_cache.set(self._auth_provider.get_name(), username, self._api_endpoint)
+
+    def set_map_cache(self, map_cache=True):
+        """
+        Incremental map refresh (MapCellCache, True for a new one or None to disable): GET_MAP_OBJECTS
+        calls send the last seen timestamp of each cell and get the merged cells back.
+        Not used for lazy/raw calls. Several instances may share one cache.
+        """
+        if map_cache is True:
+            map_cache = MapCellCache()
+        self._map_cache = map_cache
+
+    def get_map_cache(self):
+        return self._map_cache
+
     def get_position(self):
         return (self._position_lat, self._position_lng, self._position_alt)
 
@@ -105,7 +186,7 @@ class PGoApi:
         return self._api_endpoint
 
     def set_api_endpoint(self, api_url):
-        if api_url.startswith("https"):
+        if api_url.startswith(("https://", "http://")):
             self._api_endpoint = api_url
         else:
             self._api_endpoint = parse_api_endpoint(api_url)
@@ -120,15 +201,117 @@ class PGoApi:
 
     def activate_signature(self, lib_path):
         self._signature_lib = lib_path
+        self._reset_rpc_apis()
 
     def get_signature_lib(self):
         return self._signature_lib
 
+    def activate_wire_debug(self, capture_file=None, decode=True):
+        """
+        Attaches a wire debug sink to all following RPC calls. Frames get decoded into the
+        debug log (like `protoc --decode_raw`) and/or appended to a capture file.
+        """
+        self.deactivate_wire_debug()
+        self._wire_debug = WireDebug(capture_file, decode)
+        self._reset_rpc_apis()
+
+    def deactivate_wire_debug(self):
+        if self._wire_debug is not None:
+            self._wire_debug.close()
+            self._wire_debug = None
+            self._reset_rpc_apis()
+
+    def get_wire_debug(self):
+        return self._wire_debug
+
+    def set_rate_limit(self, rate, burst=1, max_throttle_retries=3):
+        """
+        Paces all requests of this account to `rate` requests/s (None = unlimited). The rate
+        gets lowered automatically if the server throttles (status 52) or is overloaded (502)
+        and throttled calls are retried up to max_throttle_retries times.
+        """
+        self._rate_governor.set_rate(rate, burst)
+        self._max_throttle_retries = max_throttle_retries
+
+    def get_rpc_api(self, proxy=None):
+        """ returns the RpcApi for the proxy config, which is shared by all requests of this instance """
+        key = None if proxy is None else tuple(sorted(proxy.items()))
+
+        rpc_api = self._rpc_apis.get(key)
+        if rpc_api is None:
+            with self._rpc_apis_lock:
+                rpc_api = self._rpc_apis.get(key)
+                if rpc_api is None:
+                    rpc_api = self._rpc_apis[key] = self.create_rpc_api(proxy)
+        return rpc_api
+
+    def create_http_session(self):
+        """ own cookies per account, keep-alive connections shared by the process - see http_pool """
+        return create_session()
+
+    def create_rpc_api(self, proxy=None):
+        rpc_api = RpcApi(self._auth_provider, proxy, self._session)
+
+        if self._signature_lib is not None:
+            rpc_api.activate_signature(self._signature_lib)
+        rpc_api.set_wire_debug(self._wire_debug)
+
+        return rpc_api
+
+    def _reset_rpc_apis(self):
+        """ drops the RpcApi instances after changes of auth provider, signature or wire debug """
+        with self._rpc_apis_lock:
+            self._rpc_apis = {}
+
+    def get_http_pool_stats(self):
+        """ process wide connection pool counters (requests, hits, misses, connect_time) """
+        return get_pool_stats()
+
+    def get_rate_governor(self):
+        return self._rate_governor
+
+    def get_max_throttle_retries(self):
+        return self._max_throttle_retries
+
+    def get_request_rate(self):
+        """ current request rate limit in requests/s for the API endpoint - None if unlimited """
+        return self._rate_governor.get_rate(self._api_endpoint)
+
+    def call_batched(self, request_name, kwargs_list, batch_size=DEFAULT_BATCH_SIZE, lazy=False):
+        """
+        Sends one request_name call per kwargs dict in kwargs_list, chaining up to batch_size
+        of them into one envelope (e.g. get_gym_details of all gyms of an area). Returns the
+        sub responses in the order of kwargs_list - None for calls without a response.
+        """
+        results = []
+        for request, count in self._create_batches(request_name, kwargs_list, batch_size):
+            self._add_batch_responses(results, request.call(lazy=lazy), request_name, count)
+
+        return results
+
+    def _create_batches(self, request_name, kwargs_list, batch_size):
+        """ yields the chained request and its number of calls per envelope of call_batched """
+        for offset in range(0, len(kwargs_list), batch_size):
+            batch = kwargs_list[offset:offset + batch_size]
+
+            request = self.create_request()
+            method = getattr(request, request_name)
+            for kwargs in batch:
+                method(**kwargs)
+
+            yield request, len(batch)
+
+    @staticmethod
+    def _add_batch_responses(results, response, request_name, count):
+        subresponses = get_sub_responses(response, request_name)
+        results.extend(subresponses[:count])
+        results.extend([None] * (count - len(subresponses)))
+
     def __getattr__(self, func):
-        def function(**kwargs):
+        def function(lazy=False, raw=False, **kwargs):
             request = self.create_request()
             getattr(request, func)(_call_direct=True, **kwargs )
-            return request.call()
+            return request.call(lazy=lazy, raw=raw)
 
         if func.upper() in RequestType.keys():
             return function
@@ -203,7 +386,48 @@ class PGoApiRequest:
 
         self._req_method_list = []
 
-    def call(self):
+        """ state of the running call() - see _begin_call """
+        self._throttle_retries = 0
+        self._map_cache = None
+        self._requested_cells = None
+
+    def call(self, lazy=False, raw=False):
+        """
+        lazy=True returns dict compatible views for the sub responses, which only convert
+        the accessed parts of the protobuf messages (use .to_dict() for a full conversion)
+
+        raw=True skips the dict conversion completely and returns a RawResponse with the
+        parsed ResponseEnvelope and the parsed sub response messages by request name
+        """
+        if not self._begin_call(lazy, raw):
+            return NotLoggedInException()
+
+        request = self.__parent__.get_rpc_api(self._proxy)
+        governor = self.__parent__.get_rate_governor()
+        response = None
+
+        execute = True
+        while execute:
+            execute = False
+
+            try:
+                governor.acquire(self._api_endpoint)
+                response = request.request(self._api_endpoint, self._req_method_list, self.get_position(), lazy, raw)
+                governor.success(self._api_endpoint)
+            except AuthTokenExpiredException:
+                self._refresh_access_token()
+
+                """ reexecute the call"""
+                execute = True
+            except (ServerSideRequestThrottlingException, ServerApiEndpointRedirectException, ServerBusyOrOfflineException, UnexpectedResponseException) as e:
+                execute = self._handle_error(e, governor)
+
+        self._auth_provider.flush_state()
+
+        return self._finish_call(response)
+
+    def _begin_call(self, lazy, raw):
+        """ checks of call() and its state (shared with the async client) - returns False if not logged in """
         if not self._req_method_list:
             raise EmptySubrequestChainException()
 
@@ -212,62 +436,85 @@ class PGoApiRequest:
 
         if self._auth_provider is None or not self._auth_provider.is_login():
             self.log.info('Not logged in')
-            return NotLoggedInException()
+            return False
 
-        request = RpcApi(self._auth_provider, self._proxy)
-        request._session = self.__parent__._session
+        self._throttle_retries = 0
 
-        lib_path = self.__parent__.get_signature_lib()
-        if lib_path is not None:
-            request.activate_signature(lib_path)
+        self._map_cache = None if lazy or raw else self.__parent__.get_map_cache()
+        if self._map_cache is not None:
+            self._requested_cells = self._map_cache.prepare(self._req_method_list)
 
         self.log.info('Execution of RPC')
-        response = None
+        return True
 
-        execute = True
-        while execute:
-            execute = False
+    def _handle_error(self, error, governor):
+        """ handles a failed request of call() - returns True if the call has to be reexecuted """
+        if isinstance(error, ServerSideRequestThrottlingException):
+            self._throttle_retries = self._throttled(governor, self._throttle_retries)
+            return True
 
-            try:
-                response = request.request(self._api_endpoint, self._req_method_list, self.get_position())
-            except AuthTokenExpiredException as e:
-                """
-                This exception only occures if the OAUTH service provider (google/ptc) didn't send any expiration date
-                so that we are assuming, that the access_token is always valid until the API server states differently.
-                """
-                try:
-                    self.log.info('Access Token rejected! Requesting new one...')
-                    self._auth_provider.get_access_token(force_refresh=True)
-                except:
-                    error = 'Request for new Access Token failed! Logged out...'
-                    self.log.error(error)
-                    raise NotLoggedInException(error)
+        if isinstance(error, ServerApiEndpointRedirectException):
+            self._redirect(error)
+            return True
 
-                """ reexecute the call"""
-                execute = True
-            except ServerApiEndpointRedirectException as e:
-                self.log.info('API Endpoint redirect... re-execution of call')
-                new_api_endpoint = e.get_redirected_endpoint()
+        if isinstance(error, ServerBusyOrOfflineException):
+            """ no reexecution here, as API retries on HTTP level should be done on a lower level, e.g. in rpc_api """
+            self.log.info('Server seems to be busy or offline - try again!')
+            self.log.debug('ServerBusyOrOfflineException details: %s', error)
 
-                self._api_endpoint = parse_api_endpoint(new_api_endpoint)
-                self.__parent__.set_api_endpoint(self._api_endpoint)
+            """ only an overloaded server slows the account down - not a timeout or a broken proxy """
+            if isinstance(error, ServerOverloadedException):
+                governor.throttled(self._api_endpoint)
+            return False
 
-                """ reexecute the call"""
-                execute = True
-            except ServerBusyOrOfflineException as e:
-                """ no execute = True here, as API retries on HTTP level should be done on a lower level, e.g. in rpc_api """
-                self.log.info('Server seems to be busy or offline - try again!')
-                self.log.debug('ServerBusyOrOfflineException details: %s', e)
-            except UnexpectedResponseException as e:
-                self.log.error('Unexpected server response!')
-                raise
+        self.log.error('Unexpected server response!')
+        raise error
+
+    def _finish_call(self, response):
+        if self._map_cache is not None and isinstance(response, dict):
+            self._map_cache.merge(response, self._requested_cells)
+        self._map_cache = None
+
+        self._cleanup()
+
+        return response
+
+    def _throttled(self, governor, throttle_retries):
+        governor.throttled(self._api_endpoint)
+
+        if throttle_retries >= self.__parent__.get_max_throttle_retries():
+            self._cleanup()
+            raise ServerSideRequestThrottlingException("Request throttled by server... slow down man")
+
+        self.log.info('Request throttled by server - retrying with %.2f requests/s', governor.get_rate(self._api_endpoint))
+        return throttle_retries + 1
 
+    def _refresh_access_token(self):
+        """
+        AuthTokenExpiredException only occures if the OAUTH service provider (google/ptc) didn't send any expiration date
+        so that we are assuming, that the access_token is always valid until the API server states differently.
+        """
+        try:
+            self.log.info('Access Token rejected! Requesting new one...')
+            self._auth_provider.get_access_token(force_refresh=True)
+        except:
+            error = 'Request for new Access Token failed! Logged out...'
+            self.log.error(error)
+            raise NotLoggedInException(error)
+
+    def _redirect(self, redirect_exception):
+        self.log.info('API Endpoint redirect... re-execution of call')
+        new_api_endpoint = redirect_exception.get_redirected_endpoint()
+
+        self._api_endpoint = parse_api_endpoint(new_api_endpoint)
+        self.__parent__.set_api_endpoint(self._api_endpoint)
+        self.__parent__.remember_api_endpoint()
+
+    def _cleanup(self):
         # cleanup after call execution
         self.log.info('Cleanup of request!')
         self._req_method_list = []
 
-        return response
-
     def list_curr_methods(self):
         for i in self._req_method_list:
             print("{} ({})".format(RequestType.Name(i), i))
@@ -0,0 +1,208 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+import asyncio
+import functools
+
+from pgoapi.pgoapi import PGoApi, PGoApiRequest, DEFAULT_BATCH_SIZE
+from pgoapi.rpc_api import RpcApi
+from pgoapi.async_http import AsyncHttpSession
+from pgoapi.exceptions import AuthException, NotLoggedInException, ServerBusyOrOfflineException, AuthTokenExpiredException, ServerApiEndpointRedirectException, UnexpectedResponseException, ServerSideRequestThrottlingException
+
+from . import protos
+from POGOProtos.Networking.Requests_pb2 import RequestType
+
+"""
+asyncio variant of PGoApi (Python 3 only). Request building, signing and response parsing
+are shared with the synchronous client, only the network I/O is awaited - so a single
+process can keep hundreds of RPC calls in flight.
+
+The blocking PTC/Google login flows are executed in the default executor of the event loop.
+Proxies are not supported by the async transport.
+"""
+
+
+class AsyncRpcApi(RpcApi):
+
+    async def request(self, endpoint, subrequests, player_position, lazy=False, raw=False):
+
+        if not self._auth_provider or self._auth_provider.is_login() is False:
+            raise NotLoggedInException()
+
+        request_proto = self._build_main_request(subrequests, player_position)
+        response = await self._make_rpc(endpoint, request_proto)
+
+        return self._process_response(response, subrequests, lazy, raw)
+
+    async def _make_rpc(self, endpoint, request_proto_plain):
+        self.log.debug('Execution of RPC')
+
+        request_proto_serialized = self._serialize_request(request_proto_plain)
+
+        try:
+            http_response = await self._session.post(endpoint, data=request_proto_serialized, timeout=30)
+        except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError, ValueError) as e:
+            """ ValueError: malformed status line or header """
+            raise ServerBusyOrOfflineException(e)
+
+        return http_response
+
+
+class AsyncPGoApi(PGoApi):
+
+    def create_request(self):
+        request = AsyncPGoApiRequest(self, self._position_lat, self._position_lng,
+                                     self._position_alt, self._proxy)
+        return request
+
+    def create_http_session(self):
+        return AsyncHttpSession(headers={'User-Agent': 'Niantic App'}, verify=True)
+
+    def get_async_session(self):
+        return self._session
+
+    def create_rpc_api(self, proxy=None):
+        if proxy is not None:
+            self.log.warning('Proxies are not supported by the async transport - ignoring proxy config')
+
+        rpc_api = AsyncRpcApi(self._auth_provider, None, self._session)
+
+        if self._signature_lib is not None:
+            rpc_api.activate_signature(self._signature_lib)
+        rpc_api.set_wire_debug(self._wire_debug)
+
+        return rpc_api
+
+    async def set_authentication_async(self, provider=None, oauth2_refresh_token=None, username=None, password=None):
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, functools.partial(self.set_authentication, provider, oauth2_refresh_token, username, password))
+
+    def __getattr__(self, func):
+        async def function(lazy=False, raw=False, **kwargs):
+            request = self.create_request()
+            getattr(request, func)(_call_direct=True, **kwargs )
+            return await request.call(lazy=lazy, raw=raw)
+
+        if func.upper() in RequestType.keys():
+            return function
+        else:
+            raise AttributeError
+
+    async def call_batched(self, request_name, kwargs_list, batch_size=DEFAULT_BATCH_SIZE, lazy=False):
+        results = []
+        for request, count in self._create_batches(request_name, kwargs_list, batch_size):
+            self._add_batch_responses(results, await request.call(lazy=lazy), request_name, count)
+
+        return results
+
+    async def app_simulation_login(self):
+        self.log.info('Starting RPC login sequence (app simulation)')
+
+        # making a standard call, like it is also done by the client
+        request = self.create_request()
+
+        request.get_player()
+        request.get_hatched_eggs()
+        request.get_inventory()
+        request.check_awarded_badges()
+        request.download_settings(hash="54b359c97e46900f87211ef6e6dd0b7f2a3ea1f5")
+
+        response = await request.call()
+
+        self.log.info('Finished RPC login sequence (app simulation)')
+
+        return response
+
+    async def login(self, provider, username, password, lat=None, lng=None, alt=None, app_simulation=True):
+
+        if lat is not None and lng is not None and alt is not None:
+            self._position_lat = lat
+            self._position_lng = lng
+            self._position_alt = alt
+
+        try:
+            await self.set_authentication_async(provider, username=username, password=password)
+        except AuthException as e:
+            self.log.error('Login process failed: %s', e)
+            return False
+
+        if app_simulation:
+            response = await self.app_simulation_login()
+        else:
+            self.log.info('Starting minimal RPC login sequence')
+            response = await self.get_player()
+            self.log.info('Finished minimal RPC login sequence')
+
+        if not response:
+            self.log.info('Login failed!')
+            return False
+
+        self.log.info('Login process completed')
+
+        return True
+
+    async def close(self):
+        await self._session.close()
+
+
+class AsyncPGoApiRequest(PGoApiRequest):
+
+    async def call(self, lazy=False, raw=False):
+        if not self._begin_call(lazy, raw):
+            return NotLoggedInException()
+
+        loop = asyncio.get_event_loop()
+
+        """ refresh an expired access token outside of the event loop before the request gets build """
+        if not self._auth_provider.check_ticket() and not self._auth_provider.check_access_token():
+            await loop.run_in_executor(None, self._auth_provider.get_access_token)
+
+        request = self.__parent__.get_rpc_api(self._proxy)
+        governor = self.__parent__.get_rate_governor()
+        response = None
+
+        execute = True
+        while execute:
+            execute = False
+
+            try:
+                delay = governor.reserve(self._api_endpoint)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                response = await request.request(self._api_endpoint, self._req_method_list, self.get_position(), lazy, raw)
+                governor.success(self._api_endpoint)
+            except AuthTokenExpiredException:
+                await loop.run_in_executor(None, self._refresh_access_token)
+
+                """ reexecute the call"""
+                execute = True
+            except (ServerSideRequestThrottlingException, ServerApiEndpointRedirectException, ServerBusyOrOfflineException, UnexpectedResponseException) as e:
+                execute = self._handle_error(e, governor)
+
+        """ the auth cache write blocks (flock) - keep it out of the event loop """
+        if self._auth_provider.is_state_changed():
+            await loop.run_in_executor(None, self._auth_provider.flush_state)
+
+        return self._finish_call(response)
@@ -2,12 +2,17 @@ import base64
 
 import six
 
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:
+    from collections import Mapping, Sequence
+
 from google.protobuf.message import Message
 from google.protobuf.descriptor import FieldDescriptor
 
 
 __all__ = ["protobuf_to_dict", "TYPE_CALLABLE_MAP", "dict_to_protobuf",
-           "REVERSE_TYPE_CALLABLE_MAP"]
+           "REVERSE_TYPE_CALLABLE_MAP", "ProtobufDictView", "ProtobufListView"]
 
 
 EXTENSION_CONTAINER = '___X'
@@ -34,41 +39,79 @@ TYPE_CALLABLE_MAP = {
 
 
 def repeated(type_callable):
-    return lambda value_list: [type_callable(value) for value in value_list]
+    return lambda value_list: list(map(type_callable, value_list))
 
 
 def enum_label_name(field, value):
     return field.enum_type.values_by_number[int(value)].name
 
 
-def protobuf_to_dict(pb, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False):
-    result_dict = {}
-    extensions = {}
-    for field, value in pb.ListFields():
-        if field.message_type and field.message_type.has_options and field.message_type.GetOptions().map_entry:
-            result_dict[field.name] = dict(value)
-            continue
+"""
+Conversion plans, compiled once per message descriptor (and type map/enum label setting).
+A plan maps field descriptors to (name, converter, is_extension), so converting a message
+only walks its set fields and calls prebuilt converters.
+"""
+_plans = {}
+
+
+def _get_plan(descriptor, type_callable_map, use_enum_labels):
+    key = (descriptor, id(type_callable_map), use_enum_labels)
+    try:
+        return _plans[key][1]
+    except KeyError:
+        """ keep a reference to the type map, so its id can not be reused while the plan exists """
+        return _plans.setdefault(key, (type_callable_map, {}))[1]
+
+
+def _is_map_entry(field):
+    return field.message_type and field.message_type.has_options and field.message_type.GetOptions().map_entry
+
+
+def _compile_field(pb, field, type_callable_map, use_enum_labels):
+    if _is_map_entry(field):
+        return (field.name, dict, field.is_extension)
+
+    if field.label == FieldDescriptor.LABEL_REPEATED and field.type == FieldDescriptor.TYPE_MESSAGE:
+        plan = _get_plan(field.message_type, type_callable_map, use_enum_labels)
+        type_callable = lambda value_list: [_convert(pb, plan, type_callable_map, use_enum_labels) for pb in value_list]
+    else:
         type_callable = _get_field_value_adaptor(pb, field, type_callable_map, use_enum_labels)
         if field.label == FieldDescriptor.LABEL_REPEATED:
             type_callable = repeated(type_callable)
 
-        if field.is_extension:
+    return (field.name, type_callable, field.is_extension)
+
+
+def _convert(pb, plan, type_callable_map, use_enum_labels):
+    result_dict = {}
+    extensions = {}
+    for field, value in pb.ListFields():
+        try:
+            name, type_callable, is_extension = plan[field]
+        except KeyError:
+            name, type_callable, is_extension = plan[field] = _compile_field(pb, field, type_callable_map, use_enum_labels)
+
+        if is_extension:
             extensions[str(field.number)] = type_callable(value)
             continue
 
-        result_dict[field.name] = type_callable(value)
+        result_dict[name] = type_callable(value)
 
     if extensions:
         result_dict[EXTENSION_CONTAINER] = extensions
     return result_dict
 
 
+def protobuf_to_dict(pb, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False):
+    plan = _get_plan(pb.DESCRIPTOR, type_callable_map, use_enum_labels)
+    return _convert(pb, plan, type_callable_map, use_enum_labels)
+
+
 def _get_field_value_adaptor(pb, field, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False):
     if field.type == FieldDescriptor.TYPE_MESSAGE:
-        # recursively encode protobuf sub-message
-        return lambda pb: protobuf_to_dict(
-            pb, type_callable_map=type_callable_map,
-            use_enum_labels=use_enum_labels)
+        # recursively encode protobuf sub-message over the (shared) plan of its descriptor
+        plan = _get_plan(field.message_type, type_callable_map, use_enum_labels)
+        return lambda pb: _convert(pb, plan, type_callable_map, use_enum_labels)
 
     if use_enum_labels and field.type == FieldDescriptor.TYPE_ENUM:
         return lambda value: enum_label_name(field, value)
@@ -80,6 +123,120 @@ def _get_field_value_adaptor(pb, field, type_callable_map=TYPE_CALLABLE_MAP, use
         pb.__class__.__name__, field.name, field.type))
 
 
+class ProtobufDictView(Mapping):
+
+    """
+    Read-only, dict compatible view of a protobuf message. Fields are converted like in
+    protobuf_to_dict, but only when they are accessed - sub messages become views again.
+    to_dict() returns the fully converted dictionary.
+    """
+
+    def __init__(self, pb, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False):
+        self._pb = pb
+        self._type_callable_map = type_callable_map
+        self._use_enum_labels = use_enum_labels
+
+        self._fields = None
+        self._cache = {}
+
+    def _get_fields(self):
+        if self._fields is None:
+            fields = {}
+            extensions = []
+            for field, value in self._pb.ListFields():
+                if field.is_extension:
+                    extensions.append((field, value))
+                else:
+                    fields[field.name] = (field, value)
+            if extensions:
+                fields[EXTENSION_CONTAINER] = (None, extensions)
+            self._fields = fields
+        return self._fields
+
+    def _convert(self, field, value):
+        if field.type == FieldDescriptor.TYPE_MESSAGE and not _is_map_entry(field):
+            if field.label == FieldDescriptor.LABEL_REPEATED:
+                return ProtobufListView(value, self._type_callable_map, self._use_enum_labels)
+            return ProtobufDictView(value, self._type_callable_map, self._use_enum_labels)
+
+        plan = _get_plan(self._pb.DESCRIPTOR, self._type_callable_map, self._use_enum_labels)
+        try:
+            type_callable = plan[field][1]
+        except KeyError:
+            plan[field] = _compile_field(self._pb, field, self._type_callable_map, self._use_enum_labels)
+            type_callable = plan[field][1]
+        return type_callable(value)
+
+    def __getitem__(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+
+        field, value = self._get_fields()[key]
+        if field is None:
+            result = dict((str(f.number), self._convert(f, v)) for f, v in value)
+        else:
+            result = self._convert(field, value)
+
+        self._cache[key] = result
+        return result
+
+    def __iter__(self):
+        return iter(self._get_fields())
+
+    def __len__(self):
+        return len(self._get_fields())
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def get_message(self):
+        return self._pb
+
+    def to_dict(self):
+        return protobuf_to_dict(self._pb, self._type_callable_map, self._use_enum_labels)
+
+
+class ProtobufListView(Sequence):
+
+    """ Read-only, list compatible view of a repeated message field - items are converted to views on access """
+
+    def __init__(self, values, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False):
+        self._values = values
+        self._type_callable_map = type_callable_map
+        self._use_enum_labels = use_enum_labels
+
+        self._items = [None] * len(values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+
+        item = self._items[index]
+        if item is None:
+            item = self._items[index] = ProtobufDictView(self._values[index], self._type_callable_map, self._use_enum_labels)
+        return item
+
+    def __len__(self):
+        return len(self._items)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, Sequence)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self):
+        return repr(self.to_list())
+
+    def to_list(self):
+        return [protobuf_to_dict(pb, self._type_callable_map, self._use_enum_labels) for pb in self._values]
+
+
 def get_bytes(value):
     return base64.b64decode(value)
 
@@ -0,0 +1,105 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import logging
+
+from google.protobuf.descriptor import FieldDescriptor
+
+from . import protos
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from POGOProtos.Networking.Requests.Messages_pb2 import GetMapObjectsMessage, GetGymDetailsMessage, FortDetailsMessage, EncounterMessage
+
+"""
+Typed builders for the request messages sent in every scan step. They check the kwargs of a call
+against the message fields up front, then fill repeated fields with one extend() and scalars with
+plain attribute assignment - no per element reflection, exception handling or debug logging.
+A builder returns None for anything it does not handle (unknown arguments, nested messages,
+values of the wrong type); RpcApi then falls back to its generic builder, which logs the problem.
+"""
+
+log = logging.getLogger(__name__)
+
+
+class MessageBuilder:
+
+    def __init__(self, message_class):
+        self.message_class = message_class
+
+        self._repeated = set()
+        self._scalars = set()
+        for field in message_class.DESCRIPTOR.fields:
+            if field.type == FieldDescriptor.TYPE_MESSAGE:
+                continue
+            if field.label == FieldDescriptor.LABEL_REPEATED:
+                self._repeated.add(field.name)
+            else:
+                self._scalars.add(field.name)
+
+    def build(self, kwargs):
+        """ returns the filled message or None if the generic builder has to handle kwargs """
+        repeated = self._repeated
+        scalars = self._scalars
+        for key, value in kwargs.items():
+            if key in repeated:
+                if not isinstance(value, list):
+                    return None
+            elif key not in scalars or isinstance(value, (list, dict)):
+                return None
+
+        message = self.message_class()
+        try:
+            for key, value in kwargs.items():
+                if key in repeated:
+                    getattr(message, key).extend(value)
+                else:
+                    setattr(message, key, value)
+        except (TypeError, ValueError) as e:
+            log.debug('%s: falling back to the generic builder (%s)', self.message_class.__name__, e)
+            return None
+
+        return message
+
+
+_builders = {
+    RequestType.Value('GET_MAP_OBJECTS'): MessageBuilder(GetMapObjectsMessage),
+    RequestType.Value('GET_GYM_DETAILS'): MessageBuilder(GetGymDetailsMessage),
+    RequestType.Value('FORT_DETAILS'): MessageBuilder(FortDetailsMessage),
+    RequestType.Value('ENCOUNTER'): MessageBuilder(EncounterMessage),
+}
+
+
+def get_builder(request_type):
+    """ returns the typed MessageBuilder of a RequestType value or None """
+    return _builders.get(request_type)
+
+
+def build_message(request_type, kwargs):
+    """ request message of request_type filled from kwargs - None if there is no typed builder for it """
+    builder = _builders.get(request_type)
+    if builder is None:
+        return None
+    return builder.build(kwargs)
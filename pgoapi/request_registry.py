@@ -0,0 +1,93 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import six
+import threading
+
+from pgoapi.utilities import to_camel_case
+
+from . import protos
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from POGOProtos.Networking.Requests import Messages_pb2
+from POGOProtos.Networking import Responses_pb2
+
+"""
+Maps every RequestType value to its *Message and *Response protobuf class over the
+POGOProtos naming convention (GET_MAP_OBJECTS -> GetMapObjectsMessage/GetMapObjectsResponse).
+The registry is built once on first use, afterwards resolving a class is a dict lookup.
+"""
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def _build_registry():
+    registry = {}
+    for name, value in RequestType.items():
+        class_name = to_camel_case(name.lower())
+        registry[value] = (name,
+                           getattr(Messages_pb2, class_name + 'Message', None),
+                           getattr(Responses_pb2, class_name + 'Response', None))
+    return registry
+
+
+def _get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = _build_registry()
+    return _registry
+
+
+def _get_entry(request_type):
+    if isinstance(request_type, six.string_types):
+        request_type = RequestType.Value(request_type.upper())
+    return _get_registry().get(request_type, (None, None, None))
+
+
+def get_request_class(request_type):
+    """ returns the *Message class of a RequestType value or name - None if there is no definition """
+    return _get_entry(request_type)[1]
+
+
+def get_response_class(request_type):
+    """ returns the *Response class of a RequestType value or name - None if there is no definition """
+    return _get_entry(request_type)[2]
+
+
+def is_supported(request_type):
+    try:
+        return _get_entry(request_type)[2] is not None
+    except ValueError:
+        return False
+
+
+def get_supported_requests():
+    """ returns the names of all request types which have a response definition, ordered by RequestType value """
+    registry = _get_registry()
+    return [registry[value][0] for value in sorted(registry) if registry[value][2] is not None]
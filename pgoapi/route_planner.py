@@ -0,0 +1,188 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import math
+import time
+import logging
+
+from pgoapi.utilities import EARTH_RADIUS
+
+"""
+Orders scan positions or gym coordinates into a short route: nearest neighbour tour plus 2-opt
+over a precomputed distance matrix (an open path from a fixed start, no return). With a
+max_speed in m/s every position gets the earliest time it may be reached, Route.walk() moves
+an api along the route (set_position) without exceeding the speed.
+"""
+
+log = logging.getLogger(__name__)
+
+
+def distance_matrix(positions):
+    """ great circle distances in meters between all (lat, lng[, alt]) positions - haversine with per position sin/cos computed once """
+    points = []
+    for position in positions:
+        lat = math.radians(position[0])
+        lng = math.radians(position[1])
+        points.append((lat, lng, math.cos(lat)))
+
+    count = len(points)
+    matrix = [[0.0] * count for i in range(count)]
+    for i in range(count):
+        lat_i, lng_i, cos_i = points[i]
+        row = matrix[i]
+        for j in range(i + 1, count):
+            lat_j, lng_j, cos_j = points[j]
+            a = math.sin((lat_j - lat_i) / 2) ** 2 + cos_i * cos_j * math.sin((lng_j - lng_i) / 2) ** 2
+            row[j] = matrix[j][i] = 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+    return matrix
+
+
+def nearest_neighbour(matrix, start=0):
+    """ visiting order starting at index start, always going to the closest unvisited position """
+    unvisited = set(range(len(matrix)))
+    unvisited.discard(start)
+
+    order = [start]
+    while unvisited:
+        row = matrix[order[-1]]
+        closest = min(unvisited, key=row.__getitem__)
+        unvisited.remove(closest)
+        order.append(closest)
+    return order
+
+
+def two_opt(matrix, order, max_passes=50):
+    """ improves an open path by reversing segments while that shortens it - the first position stays fixed """
+    order = list(order)
+    count = len(order)
+
+    for n in range(max_passes):
+        improved = False
+        for i in range(1, count - 1):
+            a = order[i - 1]
+            b = order[i]
+            row_a = matrix[a]
+            row_b = matrix[b]
+            d_ab = row_a[b]
+            for j in range(i + 1, count):
+                c = order[j]
+                if j + 1 < count:
+                    d = order[j + 1]
+                    delta = row_a[c] + row_b[d] - d_ab - matrix[c][d]
+                else:
+                    delta = row_a[c] - d_ab
+                if delta < -1e-9:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    b = order[i]
+                    row_b = matrix[b]
+                    d_ab = row_a[b]
+                    improved = True
+        if not improved:
+            break
+
+    return order
+
+
+def get_path_length(matrix, order):
+    return sum(matrix[order[i]][order[i + 1]] for i in range(len(order) - 1))
+
+
+class Route:
+
+    """
+    positions: the positions in route order
+    distances: meters from the previous position (from the start position for the first one)
+    schedule: earliest arrival at each position in seconds after the start (all 0 without max_speed)
+    """
+
+    def __init__(self, positions, order, distances, max_speed=None):
+        self.positions = positions
+        self.order = order
+        self.distances = distances
+        self.max_speed = max_speed
+
+        self.schedule = []
+        elapsed = 0.0
+        for distance in distances:
+            if max_speed:
+                elapsed += distance / max_speed
+            self.schedule.append(elapsed)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def get_total_distance(self):
+        return sum(self.distances)
+
+    def get_duration(self):
+        """ seconds the route takes at max_speed """
+        return self.schedule[-1] if self.schedule else 0.0
+
+    def walk(self, api, start_time=None):
+        """
+        for i, position in route.walk(api):
+            api.get_map_objects(...)
+
+        sets the api position to each position of the route, waiting until it can be reached at max_speed
+        """
+        if start_time is None:
+            start_time = time.time()
+
+        for i, position in enumerate(self.positions):
+            delay = start_time + self.schedule[i] - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+            api.set_position(position[0], position[1], position[2] if len(position) > 2 else 0.0)
+            yield i, position
+
+    def __repr__(self):
+        return '<Route {} positions, {:.0f}m, {:.0f}s>'.format(len(self.positions), self.get_total_distance(), self.get_duration())
+
+
+def plan_route(positions, start=None, max_speed=None, max_passes=50):
+    """
+    Route through all positions - starting at the start position (e.g. the current player position,
+    not part of the route) or at positions[0]. max_speed in meters per second or None.
+    """
+    positions = list(positions)
+    if not positions:
+        return Route([], [], [], max_speed)
+
+    points = positions if start is None else [start] + positions
+    matrix = distance_matrix(points)
+
+    order = two_opt(matrix, nearest_neighbour(matrix), max_passes)
+    distances = [matrix[order[i - 1]][order[i]] if i else 0.0 for i in range(len(order))]
+
+    if start is not None:
+        """ drop the start position, its distance to the first position stays in distances[0] """
+        order = [index - 1 for index in order[1:]]
+        distances = distances[1:]
+
+    log.debug('Route of %s positions: %.0fm', len(order), sum(distances))
+    return Route([positions[index] for index in order], order, distances, max_speed)
@@ -28,23 +28,24 @@ from __future__ import absolute_import
 import os
 import re
 import time
-import base64
 import random
 import logging
 import requests
-import subprocess
-import six
+
+from collections import namedtuple, OrderedDict
 
 from google.protobuf import message
 
 from importlib import import_module
 
-
-import ctypes
-
-from pgoapi.protobuf_to_dict import protobuf_to_dict
-from pgoapi.exceptions import NotLoggedInException, ServerBusyOrOfflineException, ServerSideRequestThrottlingException, ServerSideAccessForbiddenException, UnexpectedResponseException, AuthTokenExpiredException, ServerApiEndpointRedirectException
-from pgoapi.utilities import to_camel_case, get_time, get_format_time_diff, Rand48, long_to_bytes, generateLocation1, generateLocation2, generateRequestHash, f2i
+from pgoapi.protobuf_to_dict import protobuf_to_dict, ProtobufDictView
+from pgoapi.wire_debug import decode_raw
+from pgoapi.http_pool import create_session
+from pgoapi.signature import get_signer, get_signature_context, serialize_request
+from pgoapi.request_registry import get_request_class, get_response_class
+from pgoapi.request_builders import build_message
+from pgoapi.exceptions import NotLoggedInException, ServerBusyOrOfflineException, ServerOverloadedException, ServerSideRequestThrottlingException, ServerSideAccessForbiddenException, UnexpectedResponseException, AuthTokenExpiredException, ServerApiEndpointRedirectException
+from pgoapi.utilities import get_time, get_format_time_diff, Rand48, long_to_bytes, f2i
 
 from . import protos
 from POGOProtos.Networking.Envelopes_pb2 import RequestEnvelope
@@ -52,24 +53,55 @@ from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
 from POGOProtos.Networking.Requests_pb2 import RequestType
 import Signature_pb2
 
+""" response of a raw call - the parsed ResponseEnvelope and the parsed sub response messages by request name """
+RawResponse = namedtuple('RawResponse', ['envelope', 'responses'])
+
+
+def get_sub_responses(response, request_name):
+    """
+    list of the sub responses of request_name in a call response (dict or RawResponse) - a
+    request type chained more than once per envelope gets a list of responses in request order
+    """
+    if isinstance(response, RawResponse):
+        responses = response.responses
+    elif isinstance(response, dict):
+        responses = response.get('responses', {})
+    else:
+        return []
+
+    subresponse = responses.get(request_name.upper())
+    if subresponse is None:
+        return []
+    if isinstance(subresponse, list):
+        return subresponse
+    return [subresponse]
+
 
 class RpcApi:
 
     RPC_ID = 0
     START_TIME = 0
 
-    def __init__(self, auth_provider, proxy_config=None):
+    def __init__(self, auth_provider, proxy_config=None, session=None):
 
         self.log = logging.getLogger(__name__)
 
-        if proxy_config is not None:
-            self._session.proxies = proxy_config
+        """ the session may be shared with other RpcApi instances - proxies are passed per request """
+        if session is None:
+            session = create_session()
+        self._session = session
+        self._proxies = proxy_config
 
         self._auth_provider = auth_provider
 
         """ mystic unknown6 - revolved by PokemonGoDev """
         self._signature_gen = False
-        self._signature_lib = None
+        self._signer = None
+
+        self._wire_debug = None
+
+        """ (auth state, RequestEnvelope template, serialized auth block) - see _get_envelope_template """
+        self._envelope_template = None
 
         if RpcApi.START_TIME == 0:
             RpcApi.START_TIME = get_time(ms=True)
@@ -79,11 +111,14 @@ class RpcApi:
             self.log.debug('Generated new random RPC Request id: %s', RpcApi.RPC_ID)
 
     def activate_signature(self, lib_path):
-        try:
-            self._signature_gen = True
-            self._signature_lib = ctypes.cdll.LoadLibrary(lib_path)
-        except:
-            raise
+        self._signer = get_signer(lib_path)
+        self._signature_gen = True
+
+    def set_wire_debug(self, wire_debug):
+        self._wire_debug = wire_debug
+
+    def get_auth_provider(self):
+        return self._auth_provider
 
     def get_rpc_id(self):
         RpcApi.RPC_ID += 1
@@ -92,14 +127,7 @@ class RpcApi:
         return RpcApi.RPC_ID
 
     def decode_raw(self, raw):
-        output = error = None
-        try:
-            process = subprocess.Popen(['protoc', '--decode_raw'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, close_fds=True)
-            output, error = process.communicate(raw)
-        except:
-            output = "Couldn't find protoc in your environment OR other issue..."
-
-        return output
+        return decode_raw(raw)
 
     def get_class(self, cls):
         module_, class_ = cls.rsplit('.', 1)
@@ -109,15 +137,23 @@ class RpcApi:
     def _make_rpc(self, endpoint, request_proto_plain):
         self.log.debug('Execution of RPC')
 
-        request_proto_serialized = request_proto_plain.SerializeToString()
+        request_proto_serialized = self._serialize_request(request_proto_plain)
+
         try:
-            http_response = self._session.post(endpoint, data=request_proto_serialized, timeout=30)
+            http_response = self._session.post(endpoint, data=request_proto_serialized, timeout=30, proxies=self._proxies)
         except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
             raise ServerBusyOrOfflineException(e)
 
         return http_response
 
-    def request(self, endpoint, subrequests, player_position):
+    def _serialize_request(self, request_proto_plain):
+        request_proto_serialized = request_proto_plain.SerializeToString()
+        if self._wire_debug is not None:
+            self._wire_debug.request(request_proto_serialized)
+
+        return request_proto_serialized
+
+    def request(self, endpoint, subrequests, player_position, lazy=False, raw=False):
 
         if not self._auth_provider or self._auth_provider.is_login() is False:
             raise NotLoggedInException()
@@ -125,54 +161,60 @@ class RpcApi:
         request_proto = self._build_main_request(subrequests, player_position)
         response = self._make_rpc(endpoint, request_proto)
 
-        response_dict = self._parse_main_response(response, subrequests)
+        return self._process_response(response, subrequests, lazy, raw)
+
+    def _process_response(self, response, subrequests, lazy=False, raw=False):
+        response_proto = self._parse_response_envelope(response)
+        if response_proto is None:
+            return False
 
-        self.check_authentication(response_dict)
+        self.check_authentication(response_proto)
 
         """
         some response validations
         """
-        if isinstance(response_dict, dict):
-            status_code = response_dict.get('status_code', None)
-            if status_code == 102:
-                raise AuthTokenExpiredException()
-            elif status_code == 52:
-                raise ServerSideRequestThrottlingException("Request throttled by server... slow down man")
-            elif status_code == 53:
-                api_url = response_dict.get('api_url', None)
-                if api_url is not None:
-                    exception = ServerApiEndpointRedirectException()
-                    exception.set_redirected_endpoint(api_url)
-                    raise exception
-                else:
-                    raise UnexpectedResponseException()
+        status_code = response_proto.status_code
+        if status_code == 102:
+            raise AuthTokenExpiredException()
+        elif status_code == 52:
+            raise ServerSideRequestThrottlingException("Request throttled by server... slow down man")
+        elif status_code == 53:
+            if response_proto.api_url:
+                exception = ServerApiEndpointRedirectException()
+                exception.set_redirected_endpoint(response_proto.api_url)
+                raise exception
+            else:
+                raise UnexpectedResponseException()
 
-        return response_dict
+        if raw:
+            return self._parse_raw_response(response_proto, subrequests)
 
-    def check_authentication(self, response_dict):
-        if isinstance(response_dict, dict) and ('auth_ticket' in response_dict) and \
-           ('expire_timestamp_ms' in response_dict['auth_ticket']) and \
-           (self._auth_provider.is_new_ticket(response_dict['auth_ticket']['expire_timestamp_ms'])):
+        return self._parse_response_dict(response_proto, subrequests, lazy)
+
+    def check_authentication(self, response_proto):
+        auth_ticket = response_proto.auth_ticket
+        if response_proto.HasField('auth_ticket') and auth_ticket.expire_timestamp_ms and \
+           self._auth_provider.is_new_ticket(auth_ticket.expire_timestamp_ms):
 
             had_ticket = self._auth_provider.has_ticket()
 
-            auth_ticket = response_dict['auth_ticket']
-            self._auth_provider.set_ticket(
-                [auth_ticket['expire_timestamp_ms'], base64.standard_b64decode(auth_ticket['start']), base64.standard_b64decode(auth_ticket['end'])])
+            self._auth_provider.set_ticket([auth_ticket.expire_timestamp_ms, auth_ticket.start, auth_ticket.end])
 
             now_ms = get_time(ms=True)
-            h, m, s = get_format_time_diff(now_ms, auth_ticket['expire_timestamp_ms'], True)
+            h, m, s = get_format_time_diff(now_ms, auth_ticket.expire_timestamp_ms, True)
 
             if had_ticket:
-                self.log.debug('Replacing old Session Ticket with new one valid for %02d:%02d:%02d hours (%s < %s)', h, m, s, now_ms, auth_ticket['expire_timestamp_ms'])
+                self.log.debug('Replacing old Session Ticket with new one valid for %02d:%02d:%02d hours (%s < %s)', h, m, s, now_ms, auth_ticket.expire_timestamp_ms)
             else:
-                self.log.debug('Received Session Ticket valid for %02d:%02d:%02d hours (%s < %s)', h, m, s, now_ms, auth_ticket['expire_timestamp_ms'])
+                self.log.debug('Received Session Ticket valid for %02d:%02d:%02d hours (%s < %s)', h, m, s, now_ms, auth_ticket.expire_timestamp_ms)
 
     def _build_main_request(self, subrequests, player_position=None):
         self.log.debug('Generating main RPC request...')
 
+        template, ticket_serialized = self._get_envelope_template()
+
         request = RequestEnvelope()
-        request.status_code = 2
+        request.CopyFrom(template)
         request.request_id = self.get_rpc_id()
 
         if player_position is not None:
@@ -181,30 +223,18 @@ class RpcApi:
         request.altitude = 8  # not as suspicious as 0
 
         """ generate sub requests before signature generation """
-        request = self._build_sub_requests(request, subrequests)
-
-        ticket = self._auth_provider.get_ticket()
-        if ticket:
-            self.log.debug('Found Session Ticket - using this instead of oauth token')
-            request.auth_ticket.expire_timestamp_ms, request.auth_ticket.start, request.auth_ticket.end = ticket
-            ticket_serialized = request.auth_ticket.SerializeToString()
-
-        else:
-            self.log.debug('No Session Ticket found - using OAUTH Access Token')
-            request.auth_info.provider = self._auth_provider.get_name()
-            request.auth_info.token.contents = self._auth_provider.get_access_token()
-            request.auth_info.token.unknown2 = 59
-            ticket_serialized = request.auth_info.SerializeToString() #Sig uses this when no auth_ticket available
+        requests_serialized = []
+        request = self._build_sub_requests(request, subrequests, requests_serialized)
 
         if self._signature_gen:
             sig = Signature_pb2.Signature()
 
-            sig.location_hash1 = generateLocation1(ticket_serialized, request.latitude, request.longitude, request.altitude)
-            sig.location_hash2 = generateLocation2(request.latitude, request.longitude, request.altitude)
+            context = get_signature_context(ticket_serialized)
 
-            for req in request.requests:
-                hash = generateRequestHash(ticket_serialized, req.SerializeToString())
-                sig.request_hash.append(hash)
+            sig.location_hash1 = context.location_hash1(request.latitude, request.longitude, request.altitude)
+            sig.location_hash2 = context.location_hash2(request.latitude, request.longitude, request.altitude)
+
+            sig.request_hash.extend(context.request_hashes(requests_serialized))
 
             sig.unk22 = os.urandom(32)
             sig.timestamp = get_time(ms=True)
@@ -216,28 +246,50 @@ class RpcApi:
             u6.request_type = 6
             u6.unknown2.unknown1 = self._generate_signature(signature_proto)
 
-        # unknown stuff
-        request.unknown12 = 989
-
         self.log.debug('Generated protobuf request: \n\r%s', request)
 
         return request
 
-    def _generate_signature(self, signature_plain, lib_path="encrypt.so"):
-        if self._signature_lib is None:
-            self.activate_signature(lib_path)
-        self._signature_lib.argtypes = [ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(ctypes.c_size_t)]
-        self._signature_lib.restype = ctypes.c_int
+    def _get_envelope_template(self):
+        """
+        RequestEnvelope with the constant fields and the auth block (session ticket or oauth token)
+        plus the serialized auth block for the signature - rebuilt only if the auth state changes
+        """
+        ticket = self._auth_provider.get_ticket()
+        if ticket:
+            key = tuple(ticket)
+        else:
+            key = (self._auth_provider.get_name(), self._auth_provider.get_access_token())
+
+        cached = self._envelope_template
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+
+        template = RequestEnvelope()
+        template.status_code = 2
+
+        if ticket:
+            self.log.debug('Found Session Ticket - using this instead of oauth token')
+            template.auth_ticket.expire_timestamp_ms, template.auth_ticket.start, template.auth_ticket.end = ticket
+            ticket_serialized = template.auth_ticket.SerializeToString()
 
-        iv = os.urandom(32)
+        else:
+            self.log.debug('No Session Ticket found - using OAUTH Access Token')
+            template.auth_info.provider = key[0]
+            template.auth_info.token.contents = key[1]
+            template.auth_info.token.unknown2 = 59
+            ticket_serialized = template.auth_info.SerializeToString() #Sig uses this when no auth_ticket available
 
-        output_size = ctypes.c_size_t()
+        # unknown stuff
+        template.unknown12 = 989
 
-        self._signature_lib.encrypt(signature_plain, len(signature_plain), iv, 32, None, ctypes.byref(output_size))
-        output = (ctypes.c_ubyte * output_size.value)()
-        self._signature_lib.encrypt(signature_plain, len(signature_plain), iv, 32, ctypes.byref(output), ctypes.byref(output_size))
-        signature = b''.join(list(map(lambda x: six.int2byte(x), output)))
-        return signature
+        self._envelope_template = (key, template, ticket_serialized)
+        return template, ticket_serialized
+
+    def _generate_signature(self, signature_plain, lib_path="encrypt.so"):
+        if self._signer is None:
+            self.activate_signature(lib_path)
+        return self._signer.sign(signature_plain)
 
     def _build_main_request_orig(self, subrequests, player_position=None):
         self.log.debug('Generating main RPC request...')
@@ -268,7 +320,8 @@ class RpcApi:
 
         return request
 
-    def _build_sub_requests(self, mainrequest, subrequest_list):
+    def _build_sub_requests(self, mainrequest, subrequest_list, requests_serialized=None):
+        """ requests_serialized: optional list which receives the serialized Request messages (for the signature) """
         self.log.debug('Generating sub RPC requests...')
 
         for entry in subrequest_list:
@@ -277,61 +330,85 @@ class RpcApi:
                 entry_id = list(entry.items())[0][0]
                 entry_content = entry[entry_id]
 
-                entry_name = RequestType.Name(entry_id)
-
-                proto_name = to_camel_case(entry_name.lower()) + 'Message'
-                proto_classname = 'POGOProtos.Networking.Requests.Messages_pb2.' + proto_name
-                subrequest_extension = self.get_class(proto_classname)()
-
-                self.log.debug("Subrequest class: %s", proto_classname)
-
-                for (key, value) in entry_content.items():
-                    if isinstance(value, list):
-                        self.log.debug("Found list: %s - trying as repeated", key)
-                        for i in value:
-                            try:
-                                self.log.debug("%s -> %s", key, i)
-                                r = getattr(subrequest_extension, key)
-                                r.append(i)
-                            except Exception as e:
-                                self.log.warning('Argument %s with value %s unknown inside %s (Exception: %s)', key, i, proto_name, e)
-                    elif isinstance(value, dict):
-                        for k in value.keys():
-                            try:
-                                r = getattr(subrequest_extension, key)
-                                setattr(r, k, value[k])
-                            except Exception as e:
-                                self.log.warning('Argument %s with value %s unknown inside %s (Exception: %s)', key, str(value), proto_name, e)
-                    else:
-                        try:
-                            setattr(subrequest_extension, key, value)
-                        except Exception as e:
-                            try:
-                                self.log.debug("%s -> %s", key, value)
-                                r = getattr(subrequest_extension, key)
-                                r.append(value)
-                            except Exception as e:
-                                self.log.warning('Argument %s with value %s unknown inside %s (Exception: %s)', key, value, proto_name, e)
+                subrequest_extension = build_message(entry_id, entry_content)
+                if subrequest_extension is None:
+                    subrequest_extension = self._build_sub_request_message(entry_id, entry_content)
+
+                request_message = subrequest_extension.SerializeToString()
 
                 subrequest = mainrequest.requests.add()
                 subrequest.request_type = entry_id
-                subrequest.request_message = subrequest_extension.SerializeToString()
+                subrequest.request_message = request_message
+
+                if requests_serialized is not None:
+                    requests_serialized.append(serialize_request(entry_id, request_message))
 
             elif isinstance(entry, int):
                 subrequest = mainrequest.requests.add()
                 subrequest.request_type = entry
+
+                if requests_serialized is not None:
+                    requests_serialized.append(serialize_request(entry, b''))
             else:
                 raise Exception('Unknown value in request list')
 
         return mainrequest
 
-    def _parse_main_response(self, response_raw, subrequests):
+    def _build_sub_request_message(self, entry_id, entry_content):
+        """ generic builder - fills the request message by reflection over the kwargs """
+        subrequest_class = get_request_class(entry_id)
+        if subrequest_class is None:
+            raise Exception('No protobuf definition for request {}'.format(RequestType.Name(entry_id)))
+
+        proto_name = subrequest_class.__name__
+        subrequest_extension = subrequest_class()
+
+        self.log.debug("Subrequest class: %s", proto_name)
+
+        for (key, value) in entry_content.items():
+            if isinstance(value, list):
+                self.log.debug("Found list: %s - trying as repeated", key)
+                for i in value:
+                    try:
+                        self.log.debug("%s -> %s", key, i)
+                        r = getattr(subrequest_extension, key)
+                        r.append(i)
+                    except Exception as e:
+                        self.log.warning('Argument %s with value %s unknown inside %s (Exception: %s)', key, i, proto_name, e)
+            elif isinstance(value, dict):
+                for k in value.keys():
+                    try:
+                        r = getattr(subrequest_extension, key)
+                        setattr(r, k, value[k])
+                    except Exception as e:
+                        self.log.warning('Argument %s with value %s unknown inside %s (Exception: %s)', key, str(value), proto_name, e)
+            else:
+                try:
+                    setattr(subrequest_extension, key, value)
+                except Exception as e:
+                    try:
+                        self.log.debug("%s -> %s", key, value)
+                        r = getattr(subrequest_extension, key)
+                        r.append(value)
+                    except Exception as e:
+                        self.log.warning('Argument %s with value %s unknown inside %s (Exception: %s)', key, value, proto_name, e)
+
+        return subrequest_extension
+
+    def _parse_main_response(self, response_raw, subrequests, lazy=False):
+        response_proto = self._parse_response_envelope(response_raw)
+        if response_proto is None:
+            return False
+
+        return self._parse_response_dict(response_proto, subrequests, lazy)
+
+    def _parse_response_envelope(self, response_raw):
         self.log.debug('Parsing main RPC response...')
 
         if response_raw.status_code == 403:
             raise ServerSideAccessForbiddenException("Seems your IP Address is banned or something else went badly wrong...")
         elif response_raw.status_code == 502:
-            raise ServerBusyOrOfflineException("502: Bad Gateway")
+            raise ServerOverloadedException("502: Bad Gateway")
         elif response_raw.status_code != 200:
             error = 'Unexpected HTTP server response - needs 200 got {}'.format(response_raw.status_code)
             self.log.warning(error)
@@ -340,38 +417,80 @@ class RpcApi:
 
         if response_raw.content is None:
             self.log.warning('Empty server response!')
-            return False
+            return None
+
+        if self._wire_debug is not None:
+            self._wire_debug.response(response_raw.content)
 
         response_proto = ResponseEnvelope()
         try:
             response_proto.ParseFromString(response_raw.content)
         except message.DecodeError as e:
             self.log.warning('Could not parse response: %s', e)
-            return False
+            return None
 
         self.log.debug('Protobuf structure of rpc response:\n\r%s', response_proto)
-        try:
-            self.log.debug('Decode raw over protoc (protoc has to be in your PATH):\n\r%s', self.decode_raw(response_raw.content).decode('utf-8'))
-        except:
-            self.log.debug('Error during protoc parsing - ignored.')
 
-        response_proto_dict = protobuf_to_dict(response_proto)
-        response_proto_dict = self._parse_sub_responses(response_proto, subrequests, response_proto_dict)
+        return response_proto
 
-        return response_proto_dict
+    def _parse_response_dict(self, response_proto, subrequests, lazy=False):
+        if lazy:
+            """ the envelope itself stays a real dict, only the (never needed) returns are skipped """
+            response_proto_view = ProtobufDictView(response_proto)
+            response_proto_dict = dict((key, response_proto_view[key]) for key in response_proto_view if key != 'returns')
+        else:
+            response_proto_dict = protobuf_to_dict(response_proto)
+
+        return self._parse_sub_responses(response_proto, subrequests, response_proto_dict, lazy)
+
+    def _parse_raw_response(self, response_proto, subrequests):
+        responses = OrderedDict()
+        repeated = self._get_repeated_names(subrequests)
+        for entry_name, subresponse in self._parse_sub_messages(response_proto, subrequests):
+            self._add_sub_response(responses, entry_name, subresponse, repeated)
 
-    def _parse_sub_responses(self, response_proto, subrequests_list, response_proto_dict):
+        return RawResponse(response_proto, responses)
+
+    def _parse_sub_responses(self, response_proto, subrequests_list, response_proto_dict, lazy=False):
         self.log.debug('Parsing sub RPC responses...')
         response_proto_dict['responses'] = {}
 
-        if response_proto_dict.get('status_code', 1) == 53:
-            exception = ServerApiEndpointRedirectException()
-            exception.set_redirected_endpoint(response_proto_dict['api_url'])
-            raise exception
-
         if 'returns' in response_proto_dict:
             del response_proto_dict['returns']
 
+        repeated = self._get_repeated_names(subrequests_list)
+        for entry_name, subresponse in self._parse_sub_messages(response_proto, subrequests_list):
+            if isinstance(subresponse, message.Message):
+                if lazy:
+                    subresponse = ProtobufDictView(subresponse)
+                else:
+                    subresponse = protobuf_to_dict(subresponse)
+
+            self._add_sub_response(response_proto_dict['responses'], entry_name, subresponse, repeated)
+
+        return response_proto_dict
+
+    @staticmethod
+    def _get_repeated_names(subrequests_list):
+        """ names of the request types chained more than once - their responses are collected in lists """
+        seen = set()
+        repeated = set()
+        for entry in subrequests_list:
+            entry_id = entry if isinstance(entry, int) else list(entry.keys())[0]
+            if entry_id in seen:
+                repeated.add(RequestType.Name(entry_id))
+            seen.add(entry_id)
+        return repeated
+
+    @staticmethod
+    def _add_sub_response(responses, entry_name, subresponse, repeated):
+        if entry_name in repeated:
+            responses.setdefault(entry_name, []).append(subresponse)
+        else:
+            responses[entry_name] = subresponse
+
+    def _parse_sub_messages(self, response_proto, subrequests_list):
+        """ yields (request name, parsed sub response message) - or an error string instead of the message """
         list_len = len(subrequests_list)-1
         i = 0
         for subresponse in response_proto.returns:
@@ -385,30 +504,24 @@ class RpcApi:
                 entry_id = list(request_entry.items())[0][0]
 
             entry_name = RequestType.Name(entry_id)
-            proto_name = to_camel_case(entry_name.lower()) + 'Response'
-            proto_classname = 'POGOProtos.Networking.Responses_pb2.' + proto_name
-
-            self.log.debug("Parsing class: %s", proto_classname)
 
             subresponse_return = None
-            try:
-                subresponse_extension = self.get_class(proto_classname)()
-            except Exception as e:
-                subresponse_extension = None
-                error = 'Protobuf definition for {} not found'.format(proto_classname)
-                subresponse_return = error
-                self.log.debug(error)
+            subresponse_class = get_response_class(entry_id)
+            if subresponse_class is not None:
+                proto_classname = subresponse_class.DESCRIPTOR.full_name
+                self.log.debug("Parsing class: %s", proto_classname)
 
-            if subresponse_extension:
                 try:
-                    subresponse_extension.ParseFromString(subresponse)
-                    subresponse_return = protobuf_to_dict(subresponse_extension)
+                    subresponse_return = subresponse_class()
+                    subresponse_return.ParseFromString(subresponse)
                 except:
                     error = "Protobuf definition for {} seems not to match".format(proto_classname)
                     subresponse_return = error
                     self.log.debug(error)
+            else:
+                error = 'Protobuf definition for {} not found'.format(entry_name)
+                subresponse_return = error
+                self.log.debug(error)
 
-            response_proto_dict['responses'][entry_name] = subresponse_return
+            yield (entry_name, subresponse_return)
             i += 1
-
-        return response_proto_dict
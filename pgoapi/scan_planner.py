@@ -0,0 +1,167 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import heapq
+import logging
+
+from s2sphere import LatLng, LatLngRect, Angle, Cap, CellId, RegionCoverer, math
+
+from pgoapi.utilities import EARTH_RADIUS, precompute_cell_ids
+
+"""
+Set cover scan planning: the level 15 cells of an area (circle or polygon) are the targets, every
+target cell center is a candidate scan position which reaches the cells of its get_cell_ids()
+covering. Greedy set cover (lazy evaluated) picks the fewest positions reaching all target cells -
+within ln(n) + 1 of the optimum. Every target cell is requested only at the first position
+reaching it, so a plan fetches each cell once.
+"""
+
+log = logging.getLogger(__name__)
+
+CELL_LEVEL = 15
+
+
+class ScanPlan:
+
+    """
+    positions: (lat, lng) scan positions in pick order
+    cell_ids: the cell ids to request at each position (every target cell exactly once)
+    overlap_ratio: how often a covered target cell is reached by further positions (0.0 = no overlap)
+    """
+
+    def __init__(self, positions, cell_ids, target_cells, reached_cells, uncovered):
+        self.positions = positions
+        self.cell_ids = cell_ids
+        self.target_cells = target_cells
+        self.uncovered = uncovered
+
+        covered = target_cells - len(uncovered)
+        self.overlap_ratio = float(reached_cells) / covered - 1.0 if covered else 0.0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def get_call_count(self):
+        """ GET_MAP_OBJECTS calls of the plan - one per position """
+        return len(self.positions)
+
+    def get_coverage(self):
+        if not self.target_cells:
+            return 1.0
+        return 1.0 - float(len(self.uncovered)) / self.target_cells
+
+    def __repr__(self):
+        return '<ScanPlan {} calls for {} cells, overlap {:.2f}, coverage {:.1%}>'.format(
+            self.get_call_count(), self.target_cells, self.overlap_ratio, self.get_coverage())
+
+
+def _get_coverer():
+    coverer = RegionCoverer()
+    coverer.min_level = CELL_LEVEL
+    coverer.max_level = CELL_LEVEL
+    return coverer
+
+
+def get_area_cell_ids(lat, lng, radius):
+    """ level 15 cells of the circle around lat/lng with radius in meters """
+    region = Cap.from_axis_angle(LatLng.from_degrees(lat, lng).to_point(), Angle.from_degrees(360 * radius / (2 * math.pi * EARTH_RADIUS)))
+    return sorted(cell.id() for cell in _get_coverer().get_covering(region))
+
+
+def _in_polygon(lat, lng, polygon):
+    """ ray casting in the lat/lng plane - fine for city sized polygons away from the poles and the date line """
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lng_i = polygon[i][:2]
+        lat_j, lng_j = polygon[j][:2]
+        if (lng_i > lng) != (lng_j > lng) and lat < (lat_j - lat_i) * (lng - lng_i) / (lng_j - lng_i) + lat_i:
+            inside = not inside
+        j = i
+    return inside
+
+
+def get_polygon_cell_ids(polygon):
+    """ level 15 cells with their center inside the polygon, a list of (lat, lng) vertices """
+    lats = [vertex[0] for vertex in polygon]
+    lngs = [vertex[1] for vertex in polygon]
+    region = LatLngRect.from_point_pair(LatLng.from_degrees(min(lats), min(lngs)), LatLng.from_degrees(max(lats), max(lngs)))
+
+    cell_ids = []
+    for cell in _get_coverer().get_covering(region):
+        center = cell.to_lat_lng()
+        if _in_polygon(center.lat().degrees, center.lng().degrees, polygon):
+            cell_ids.append(cell.id())
+    return sorted(cell_ids)
+
+
+def _get_cell_center(cell_id):
+    center = CellId(cell_id).to_lat_lng()
+    return (center.lat().degrees, center.lng().degrees)
+
+
+def plan_scan(target_cell_ids, radius=1000):
+    """ ScanPlan reaching the target cells with GET_MAP_OBJECTS calls of get_cell_ids(lat, lng, radius) """
+    targets = set(target_cell_ids)
+    candidates = [_get_cell_center(cell_id) for cell_id in sorted(targets)]
+    grid = precompute_cell_ids(candidates, radius)
+
+    reach = [targets.intersection(grid[i]) for i in range(len(grid))]
+
+    """ lazy greedy: gains only shrink, so a popped candidate whose recomputed gain still beats the next one is the best """
+    heap = [(-len(cells), i) for i, cells in enumerate(reach) if cells]
+    heapq.heapify(heap)
+
+    uncovered = set(targets)
+    picked = []
+    while uncovered and heap:
+        gain, i = heapq.heappop(heap)
+        new_cells = reach[i] & uncovered
+        if not new_cells:
+            continue
+        if heap and len(new_cells) < -heap[0][0]:
+            heapq.heappush(heap, (-len(new_cells), i))
+            continue
+
+        picked.append((i, sorted(new_cells)))
+        uncovered -= new_cells
+
+    reached = sum(len(reach[i]) for i, cells in picked)
+    plan = ScanPlan([candidates[i] for i, cells in picked], [cells for i, cells in picked], len(targets), reached, uncovered)
+
+    log.debug('Planned %s', plan)
+    return plan
+
+
+def plan_area(lat, lng, area_radius, radius=1000):
+    """ ScanPlan for the circle around lat/lng with area_radius meters """
+    return plan_scan(get_area_cell_ids(lat, lng, area_radius), radius)
+
+
+def plan_polygon(polygon, radius=1000):
+    """ ScanPlan for a polygon of (lat, lng) vertices """
+    return plan_scan(get_polygon_cell_ids(polygon), radius)
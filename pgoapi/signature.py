@@ -0,0 +1,219 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import os
+import ctypes
+import xxhash
+import logging
+import threading
+
+from collections import OrderedDict
+
+from google.protobuf.internal.encoder import _VarintBytes
+
+from pgoapi.utilities import pack_location, pack_locations
+from pgoapi.exceptions import SignatureLibraryException
+
+try:
+    from xxhash import xxh32_intdigest, xxh64_intdigest
+except ImportError:
+    """ xxhash < 1.4 """
+    def xxh32_intdigest(data, seed=0):
+        return xxhash.xxh32(data, seed=seed).intdigest()
+
+    def xxh64_intdigest(data, seed=0):
+        return xxhash.xxh64(data, seed=seed).intdigest()
+
+"""
+The signature library (encrypt.so/.dll/.dylib) is loaded only once per path and process.
+Signers wrap the native encrypt() function with reusable per thread output buffers and can be
+shared by all threads and PGoApi instances.
+"""
+
+_signers = {}
+_signers_lock = threading.Lock()
+
+HASH_SEED = 0x1B845238
+
+_contexts = OrderedDict()
+_contexts_lock = threading.Lock()
+CONTEXT_CACHE_SIZE = 128
+
+
+class Signer:
+
+    MIN_BUFFER_SIZE = 512
+
+    def __init__(self, lib_path):
+        self.log = logging.getLogger(__name__)
+
+        self._local = threading.local()
+        self._output_sizes = {}
+
+        self.lib_path = lib_path
+        self._lib = ctypes.cdll.LoadLibrary(lib_path)
+
+        """ int encrypt(const char *input, size_t input_size, const char *iv, size_t iv_size, unsigned char *output, size_t *output_size) """
+        self._encrypt = self._lib.encrypt
+        self._encrypt.argtypes = [ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(ctypes.c_size_t)]
+        self._encrypt.restype = ctypes.c_int
+
+        self.log.debug('Loaded signature library %s', lib_path)
+
+    def sign(self, signature_plain, iv=None):
+        """ encrypts the serialized Signature proto - returns the bytes for unknown6 """
+        if iv is None:
+            iv = os.urandom(32)
+
+        input_size = len(signature_plain)
+        output_size, output_size_ref = self._get_output_size()
+
+        """ the output size only depends on the input sizes - probe the library once per size """
+        key = (input_size, len(iv))
+        size = self._output_sizes.get(key)
+        if size is None:
+            ret = self._encrypt(signature_plain, input_size, iv, len(iv), None, output_size_ref)
+            if ret != 0:
+                raise SignatureLibraryException('encrypt() failed to report the output size: {}'.format(ret))
+            size = self._output_sizes[key] = output_size.value
+
+        output = self._get_buffer(size)
+        output_size.value = len(output)
+        ret = self._encrypt(signature_plain, input_size, iv, len(iv), output, output_size_ref)
+
+        if output_size.value > len(output):
+            """ the library needs more than the probed size - grow the buffer and encrypt again """
+            size = self._output_sizes[key] = output_size.value
+            output = self._get_buffer(size)
+            output_size.value = len(output)
+            ret = self._encrypt(signature_plain, input_size, iv, len(iv), output, output_size_ref)
+
+        if ret != 0 or output_size.value > len(output):
+            raise SignatureLibraryException('encrypt() failed: {} (output size {})'.format(ret, output_size.value))
+
+        size = output_size.value
+        if size != self._output_sizes[key]:
+            self._output_sizes[key] = size
+        return ctypes.string_at(output, size)
+
+    def _get_output_size(self):
+        output_size = getattr(self._local, 'output_size', None)
+        if output_size is None:
+            size = ctypes.c_size_t()
+            output_size = self._local.output_size = (size, ctypes.byref(size))
+        return output_size
+
+    def _get_buffer(self, size):
+        """ per thread output buffers, in power of two size buckets """
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+
+        bucket = self.MIN_BUFFER_SIZE
+        while bucket < size:
+            bucket <<= 1
+
+        buffer = buffers.get(bucket)
+        if buffer is None:
+            buffer = buffers[bucket] = (ctypes.c_ubyte * bucket)()
+        return buffer
+
+
+def get_signer(lib_path):
+    """ returns the process wide Signer of the library at lib_path, loading it on first use """
+    signer = _signers.get(lib_path)
+    if signer is None:
+        with _signers_lock:
+            signer = _signers.get(lib_path)
+            if signer is None:
+                signer = _signers[lib_path] = Signer(lib_path)
+    return signer
+
+
+class SignatureContext:
+
+    """
+    Hashes of the Signature proto for one auth ticket (serialized AuthTicket or AuthInfo).
+    The ticket seeds of the request and location hashes are computed only once per ticket.
+    """
+
+    def __init__(self, ticket_serialized):
+        self.ticket_serialized = ticket_serialized
+
+        self._request_seed = xxh64_intdigest(ticket_serialized, HASH_SEED)
+        self._location_seed = xxh32_intdigest(ticket_serialized, HASH_SEED)
+
+    def location_hash1(self, lat, lng, alt):
+        return xxh32_intdigest(pack_location(lat, lng, alt), self._location_seed)
+
+    @staticmethod
+    def location_hash2(lat, lng, alt):
+        return xxh32_intdigest(pack_location(lat, lng, alt), HASH_SEED)
+
+    def location_hashes1(self, positions):
+        """ location_hash1 of many (lat, lng, alt) positions, e.g. for scan planning """
+        seed = self._location_seed
+        return [xxh32_intdigest(block, seed) for block in pack_locations(positions)]
+
+    @staticmethod
+    def location_hashes2(positions):
+        return [xxh32_intdigest(block, HASH_SEED) for block in pack_locations(positions)]
+
+    def request_hash(self, request_serialized):
+        return xxh64_intdigest(request_serialized, self._request_seed)
+
+    def request_hashes(self, requests_serialized):
+        """ hashes of a whole request chain (serialized Request messages) """
+        seed = self._request_seed
+        return [xxh64_intdigest(request, seed) for request in requests_serialized]
+
+
+def get_signature_context(ticket_serialized):
+    """ returns the (cached) SignatureContext of the ticket """
+    with _contexts_lock:
+        context = _contexts.get(ticket_serialized)
+        if context is not None:
+            _contexts.pop(ticket_serialized)
+        else:
+            context = SignatureContext(ticket_serialized)
+            if len(_contexts) >= CONTEXT_CACHE_SIZE:
+                _contexts.popitem(last=False)
+        _contexts[ticket_serialized] = context
+        return context
+
+
+def serialize_request(request_type, request_message):
+    """
+    Serialized Request message (request_type = 1, request_message = 2) - byte-identical to
+    Request.SerializeToString(), but reuses the already serialized request_message
+    """
+    parts = []
+    if request_type:
+        parts.append(b'\x08' + _VarintBytes(request_type))
+    if request_message:
+        parts.append(b'\x12' + _VarintBytes(len(request_message)) + request_message)
+    return b''.join(parts)
@@ -0,0 +1,206 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import time
+import logging
+import threading
+
+
+class TokenBucket:
+
+    """
+    Thread-safe token bucket. reserve() takes a token and returns the seconds the caller
+    has to wait before using it, so it works for threads (time.sleep) and asyncio (asyncio.sleep).
+    rate=None means unlimited - the bucket then only measures the request rate.
+    """
+
+    EWMA_WEIGHT = 0.2
+
+    def __init__(self, rate=None, burst=1):
+        self._lock = threading.Lock()
+
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._last = time.time()
+
+        self._last_reserve = None
+        self._interval = None
+
+    def get_rate(self):
+        return self._rate
+
+    def set_rate(self, rate, burst=None):
+        with self._lock:
+            self._refill(time.time())
+            self._rate = rate
+            if burst is not None:
+                self._burst = burst
+            self._tokens = min(self._tokens, self._burst)
+
+    def drain(self):
+        """ drops all available tokens, so the next request has to wait a full interval """
+        with self._lock:
+            self._refill(time.time())
+            self._tokens = min(self._tokens, 0.0)
+
+    def get_observed_rate(self):
+        """ requests per second, measured over the recent reservations """
+        if not self._interval:
+            return None
+        return 1.0 / self._interval
+
+    def _refill(self, now):
+        if self._rate is not None:
+            self._tokens = min(self._burst, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+
+    def reserve(self):
+        with self._lock:
+            now = time.time()
+
+            if self._last_reserve is not None:
+                interval = now - self._last_reserve
+                if self._interval is None:
+                    self._interval = interval
+                else:
+                    self._interval += self.EWMA_WEIGHT * (interval - self._interval)
+            self._last_reserve = now
+
+            if self._rate is None:
+                return 0.0
+
+            self._refill(now)
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class RateGovernor:
+
+    """
+    Per account request pacing with one token bucket per API endpoint. The rate gets multiplied
+    by backoff_factor if the server throttles (status 52) or is overloaded (502) and grows by
+    recovery_factor per successful call - relative to the current rate, but at least relative to
+    start_rate, so a low rate recovers within a few calls. An unlimited endpoint backs off from
+    its measured request rate (or from start_rate if there is nothing measured yet).
+    """
+
+    def __init__(self, rate=None, burst=1, min_rate=0.2, max_rate=None, backoff_factor=0.5, recovery_factor=0.25, start_rate=5.0):
+        self.log = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._stats = {}
+
+        self._rate = rate
+        self._burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.backoff_factor = backoff_factor
+        self.recovery_factor = recovery_factor
+        self.start_rate = start_rate
+
+    def set_rate(self, rate, burst=1):
+        with self._lock:
+            self._rate = rate
+            self._burst = burst
+            for bucket in self._buckets.values():
+                bucket.set_rate(rate, burst)
+
+    def _get_bucket(self, endpoint):
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(endpoint)
+                if bucket is None:
+                    bucket = self._buckets[endpoint] = TokenBucket(self._rate, self._burst)
+                    self._stats[endpoint] = {'requests': 0, 'throttled': 0, 'waited': 0.0}
+        return bucket
+
+    def reserve(self, endpoint):
+        delay = self._get_bucket(endpoint).reserve()
+        with self._lock:
+            stats = self._stats[endpoint]
+            stats['requests'] += 1
+            stats['waited'] += delay
+        return delay
+
+    def acquire(self, endpoint):
+        delay = self.reserve(endpoint)
+        if delay > 0:
+            self.log.debug('Rate governor: waiting %.3fs for %s', delay, endpoint)
+            time.sleep(delay)
+        return delay
+
+    def success(self, endpoint):
+        bucket = self._get_bucket(endpoint)
+        rate = bucket.get_rate()
+        if rate is not None and self.recovery_factor:
+            """ never recover beyond the configured rate """
+            max_rate = self._rate if self._rate is not None else self.max_rate
+            if max_rate is not None and rate >= max_rate:
+                return
+            new_rate = rate + self.recovery_factor * max(rate, self.start_rate)
+            if max_rate is not None:
+                new_rate = min(new_rate, max_rate)
+            bucket.set_rate(new_rate)
+
+    def throttled(self, endpoint):
+        bucket = self._get_bucket(endpoint)
+        rate = bucket.get_rate()
+        if rate is None:
+            rate = bucket.get_observed_rate() or self.start_rate
+
+        new_rate = max(self.min_rate, rate * self.backoff_factor)
+        bucket.set_rate(new_rate)
+        bucket.drain()
+        with self._lock:
+            self._stats[endpoint]['throttled'] += 1
+
+        self.log.info('Rate governor: server throttled %s - slowing down to %.2f requests/s', endpoint, new_rate)
+
+    def get_rate(self, endpoint):
+        """ current request rate limit for the endpoint in requests/s - None if unlimited """
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            return self._rate
+        return bucket.get_rate()
+
+    def get_metrics(self):
+        metrics = {}
+        with self._lock:
+            for endpoint, bucket in self._buckets.items():
+                metrics[endpoint] = dict(self._stats[endpoint], rate=bucket.get_rate(), observed_rate=bucket.get_observed_rate())
+        return metrics
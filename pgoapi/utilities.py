@@ -25,10 +25,15 @@ Author: tjado <https://github.com/tejado>
 
 import re
 import time
+import sys
 import struct
 import ctypes
 import xxhash
 import logging
+import threading
+
+from array import array
+from collections import OrderedDict
 
 from json import JSONEncoder
 from binascii import unhexlify
@@ -69,18 +74,106 @@ def get_pos_by_name(location_name):
     return (loc.latitude, loc.longitude, loc.altitude)
 
 EARTH_RADIUS = 6371 * 1000
-def get_cell_ids(lat, long, radius=1000):
+
+"""
+Coverings are cached per position rounded to COVERING_PRECISION decimal places (~0.1 m) and whole
+meters of radius - the covering is computed for the rounded position, so equal keys always get
+equal cell ids. Scan loops revisiting their positions skip the (pure python) s2sphere covering.
+"""
+COVERING_PRECISION = 6
+COVERING_CACHE_SIZE = 1024
+
+_coverings = OrderedDict()
+_coverings_lock = threading.Lock()
+
+def _covering_key(lat, long, radius):
     # Max values allowed by server according to this comment:
     # https://github.com/AeonLucid/POGOProtos/issues/83#issuecomment-235612285
     if radius > 1500:
         radius = 1500  # radius = 1500 is max allowed by the server
+    return (round(lat, COVERING_PRECISION), round(long, COVERING_PRECISION), int(round(radius)))
+
+def _get_covering(key, coverer=None, store=True):
+    """ store=False only reads the LRU, e.g. for bulk coverings which would evict the entries of the scan loop """
+    with _coverings_lock:
+        cells = _coverings.get(key)
+        if cells is not None:
+            if store:
+                _coverings.pop(key)
+                _coverings[key] = cells
+            return cells
+
+    lat, long, radius = key
+    if coverer is None:
+        coverer = RegionCoverer()
+        coverer.min_level = 15
+        coverer.max_level = 15
     region = Cap.from_axis_angle(LatLng.from_degrees(lat, long).to_point(), Angle.from_degrees(360*radius/(2*math.pi*EARTH_RADIUS)))
+    cells = coverer.get_covering(region)
+    cells = cells[:100]  # len(cells) = 100 is max allowed by the server
+    cells = tuple(sorted([x.id() for x in cells]))
+    if not store:
+        return cells
+
+    with _coverings_lock:
+        _coverings[key] = cells
+        while len(_coverings) > COVERING_CACHE_SIZE:
+            _coverings.popitem(last=False)
+    return cells
+
+def get_cell_ids(lat, long, radius=1000):
+    return list(_get_covering(_covering_key(lat, long, radius)))
+
+def clear_cell_id_cache():
+    with _coverings_lock:
+        _coverings.clear()
+
+try:
+    array('Q')
+    CELL_ID_TYPECODE = 'Q'
+except ValueError:
+    """ Python 2 has no 'Q' arrays - 'L' is 64 bit on all 64 bit platforms except Windows """
+    CELL_ID_TYPECODE = 'L'
+
+class CellIdGrid:
+
+    """
+    Level 15 coverings of a list of scan positions, all cell ids in one flat array plus the start
+    offset of every position: grid[i] are the cell ids of positions[i].
+    """
+
+    def __init__(self, positions, cell_ids, offsets):
+        self.positions = positions
+        self.cell_ids = cell_ids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.positions)
+        return self.cell_ids[self.offsets[index]:self.offsets[index + 1]].tolist()
+
+    def get_unique_cell_ids(self):
+        return sorted(set(self.cell_ids))
+
+def precompute_cell_ids(positions, radius=1000):
+    """
+    CellIdGrid of all (lat, lng[, alt]) positions of a scan area, computed in one pass with one RegionCoverer -
+    the grid holds the coverings itself, they are not added to the get_cell_ids cache
+    """
     coverer = RegionCoverer()
     coverer.min_level = 15
     coverer.max_level = 15
-    cells = coverer.get_covering(region)
-    cells = cells[:100]  # len(cells) = 100 is max allowed by the server
-    return sorted([x.id() for x in cells])
+
+    cell_ids = array(CELL_ID_TYPECODE)
+    offsets = array(CELL_ID_TYPECODE, [0])
+    for position in positions:
+        cell_ids.extend(_get_covering(_covering_key(position[0], position[1], radius), coverer, store=False))
+        offsets.append(len(cell_ids))
+
+    return CellIdGrid(list(positions), cell_ids, offsets)
 
 def get_time(ms = False):
     if ms:
@@ -99,7 +192,7 @@ def get_format_time_diff(low, high, ms = True):
     return (h, m, s)
 
 def parse_api_endpoint(api_url):
-    if not api_url.startswith("https"):
+    if not api_url.startswith(("https://", "http://")):
         api_url = 'https://{}/rpc'.format(api_url)
 
     return api_url
@@ -160,26 +253,51 @@ def long_to_bytes (val, endianness='big'):
     return s
     
     
-def generateLocation1(authticket, lat, lng, alt): 
-    firstHash = xxhash.xxh32(authticket, seed=0x1B845238).intdigest()
-    locationBytes = d2h(lat) + d2h(lng) + d2h(alt)
-    if not alt:
-        alt = "\x00\x00\x00\x00\x00\x00\x00\x00"
-    return xxhash.xxh32(locationBytes, seed=firstHash).intdigest()
+def generateLocation1(authticket, lat, lng, alt):
+    """ shares the cached ticket seed with the signature generation of RpcApi """
+    from pgoapi.signature import get_signature_context
+    return get_signature_context(authticket).location_hash1(lat, lng, alt)
 
 def generateLocation2(lat, lng, alt):
-    locationBytes = d2h(lat) + d2h(lng) + d2h(alt)
-    if not alt:
-        alt = "\x00\x00\x00\x00\x00\x00\x00\x00"
+    locationBytes = pack_location(lat, lng, alt)
     return xxhash.xxh32(locationBytes, seed=0x1B845238).intdigest()      #Hash of location using static seed 0x1B845238
     
 
 def generateRequestHash(authticket, request):
-    firstHash = xxhash.xxh64(authticket, seed=0x1B845238).intdigest()                      
-    return xxhash.xxh64(request, seed=firstHash).intdigest()
+    from pgoapi.signature import get_signature_context
+    return get_signature_context(authticket).request_hash(request)
 
 
 def d2h(f):
     hex_str = f2h(f)[2:].replace('L','')
     hex_str = ("0" * (len(hex_str) % 2)) + hex_str
     return unhexlify(hex_str)
+
+
+LOCATION_STRUCT = struct.Struct('>ddd')
+
+def pack_location(lat, lng, alt):
+    """
+    d2h(lat) + d2h(lng) + d2h(alt) in one struct call. d2h drops leading zero bytes, which a
+    big-endian double only has for 0.0 and denormals - those take the slow path.
+    """
+    packed = LOCATION_STRUCT.pack(lat, lng, alt)
+    if packed[0:1] != b'\x00' and packed[8:9] != b'\x00' and packed[16:17] != b'\x00':
+        return packed
+    return d2h(lat) + d2h(lng) + d2h(alt)
+
+def pack_locations(positions):
+    """ pack_location of many (lat, lng, alt) positions at once """
+    values = array('d', [value for position in positions for value in position[:3]])
+    if sys.byteorder == 'little':
+        values.byteswap()
+
+    packed = values.tostring() if sys.version_info[0] < 3 else values.tobytes()
+
+    blocks = []
+    for offset in range(0, len(packed), 24):
+        block = packed[offset:offset + 24]
+        if block[0:1] == b'\x00' or block[8:9] == b'\x00' or block[16:17] == b'\x00':
+            block = pack_location(*positions[offset // 24][:3])
+        blocks.append(block)
+    return blocks
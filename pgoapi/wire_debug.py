@@ -0,0 +1,239 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import struct
+import logging
+import threading
+
+from pgoapi.utilities import get_time
+
+WIRETYPE_VARINT = 0
+WIRETYPE_FIXED64 = 1
+WIRETYPE_LENGTH_DELIMITED = 2
+WIRETYPE_START_GROUP = 3
+WIRETYPE_END_GROUP = 4
+WIRETYPE_FIXED32 = 5
+
+DIRECTION_REQUEST = b'>'
+DIRECTION_RESPONSE = b'<'
+
+""" capture frame header: direction, timestamp in ms, payload length """
+FRAME_HEADER = struct.Struct('>cQI')
+
+_ESCAPES = {0x0a: '\\n', 0x0d: '\\r', 0x09: '\\t', 0x22: '\\"', 0x27: "\\'", 0x5c: '\\\\'}
+
+
+class RawDecodeError(Exception):
+    pass
+
+
+def _read_varint(data, pos, end):
+    result = 0
+    shift = 0
+    while True:
+        if pos >= end or shift > 63:
+            raise RawDecodeError('Truncated varint')
+        b = data[pos]
+        result |= (b & 0x7f) << shift
+        pos += 1
+        if not b & 0x80:
+            return result & 0xffffffffffffffff, pos
+        shift += 7
+
+
+def _parse_fields(data, pos, end, group=None):
+    """ returns a list of (number, wire_type, value) - raises RawDecodeError if data is no valid message """
+    fields = []
+    while pos < end:
+        key, pos = _read_varint(data, pos, end)
+        number, wire_type = key >> 3, key & 7
+        if number == 0:
+            raise RawDecodeError('Invalid field number 0')
+
+        if wire_type == WIRETYPE_VARINT:
+            value, pos = _read_varint(data, pos, end)
+        elif wire_type == WIRETYPE_FIXED64:
+            if pos + 8 > end:
+                raise RawDecodeError('Truncated fixed64')
+            value = struct.unpack_from('<Q', data, pos)[0]
+            pos += 8
+        elif wire_type == WIRETYPE_FIXED32:
+            if pos + 4 > end:
+                raise RawDecodeError('Truncated fixed32')
+            value = struct.unpack_from('<I', data, pos)[0]
+            pos += 4
+        elif wire_type == WIRETYPE_LENGTH_DELIMITED:
+            length, pos = _read_varint(data, pos, end)
+            if pos + length > end:
+                raise RawDecodeError('Truncated length delimited field')
+            value = (pos, pos + length)
+            pos += length
+        elif wire_type == WIRETYPE_START_GROUP:
+            value, pos = _parse_fields(data, pos, end, group=number)
+        elif wire_type == WIRETYPE_END_GROUP:
+            if group != number:
+                raise RawDecodeError('Unexpected end group tag')
+            return fields, pos
+        else:
+            raise RawDecodeError('Invalid wire type {}'.format(wire_type))
+
+        fields.append((number, wire_type, value))
+
+    if group is not None:
+        raise RawDecodeError('Missing end group tag')
+
+    return fields, pos
+
+
+def _escape(data, start, end):
+    out = []
+    for i in range(start, end):
+        b = data[i]
+        if b in _ESCAPES:
+            out.append(_ESCAPES[b])
+        elif 0x20 <= b < 0x7f:
+            out.append(chr(b))
+        else:
+            out.append('\\%03o' % b)
+    return ''.join(out)
+
+
+def _format_fields(data, fields, indent, lines):
+    prefix = '  ' * indent
+    for number, wire_type, value in fields:
+        if wire_type == WIRETYPE_VARINT:
+            lines.append('{}{}: {}'.format(prefix, number, value))
+        elif wire_type == WIRETYPE_FIXED64:
+            lines.append('{}{}: 0x{:016x}'.format(prefix, number, value))
+        elif wire_type == WIRETYPE_FIXED32:
+            lines.append('{}{}: 0x{:08x}'.format(prefix, number, value))
+        elif wire_type == WIRETYPE_START_GROUP:
+            lines.append('{}{} {{'.format(prefix, number))
+            _format_fields(data, value, indent + 1, lines)
+            lines.append('{}}}'.format(prefix))
+        else:
+            start, end = value
+            embedded = None
+            if end > start:
+                try:
+                    embedded = _parse_fields(data, start, end)[0]
+                except RawDecodeError:
+                    embedded = None
+
+            if embedded is not None:
+                lines.append('{}{} {{'.format(prefix, number))
+                _format_fields(data, embedded, indent + 1, lines)
+                lines.append('{}}}'.format(prefix))
+            else:
+                lines.append('{}{}: "{}"'.format(prefix, number, _escape(data, start, end)))
+
+
+def decode_raw(raw):
+    """
+    Pure python equivalent of `protoc --decode_raw` - decodes any serialized
+    protobuf message without knowing its definition.
+    """
+    data = bytearray(raw)
+    try:
+        fields = _parse_fields(data, 0, len(data))[0]
+    except RawDecodeError as e:
+        return 'Failed to parse input: {}'.format(e)
+
+    lines = []
+    _format_fields(data, fields, 0, lines)
+    if lines:
+        lines.append('')
+    return '\n'.join(lines)
+
+
+class WireDebug:
+
+    """
+    Debug sink for RPC frames. Frames are only touched if a sink is attached to
+    the RpcApi, so there are no costs at all if wire debugging is not activated.
+    """
+
+    def __init__(self, capture_file=None, decode=True):
+        self.log = logging.getLogger(__name__)
+
+        self._decode = decode
+        self._lock = threading.Lock()
+
+        self._capture = None
+        self._owns_capture = False
+        if capture_file is not None:
+            if hasattr(capture_file, 'write'):
+                self._capture = capture_file
+            else:
+                self._capture = open(capture_file, 'ab')
+                self._owns_capture = True
+
+    def request(self, raw):
+        self._frame(DIRECTION_REQUEST, raw)
+
+    def response(self, raw):
+        self._frame(DIRECTION_RESPONSE, raw)
+
+    def _frame(self, direction, raw):
+        if raw is None:
+            return
+
+        if self._capture is not None:
+            header = FRAME_HEADER.pack(direction, get_time(ms=True), len(raw))
+            with self._lock:
+                """ close() may have detached the capture meanwhile (calls still in flight) """
+                if self._capture is not None:
+                    self._capture.write(header + raw)
+                    self._capture.flush()
+
+        if self._decode and self.log.isEnabledFor(logging.DEBUG):
+            if direction == DIRECTION_REQUEST:
+                self.log.debug('Raw decode of rpc request:\n\r%s', decode_raw(raw))
+            else:
+                self.log.debug('Raw decode of rpc response:\n\r%s', decode_raw(raw))
+
+    def close(self):
+        """ detaches the capture - only a file opened by WireDebug itself gets closed """
+        with self._lock:
+            if self._capture is not None and self._owns_capture:
+                self._capture.close()
+            self._capture = None
+            self._owns_capture = False
+
+
+def read_capture(capture_file):
+    """ yields (direction, timestamp_ms, raw) for every frame of a capture file written by WireDebug """
+    with open(capture_file, 'rb') as f:
+        while True:
+            header = f.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            direction, timestamp, length = FRAME_HEADER.unpack(header)
+            raw = f.read(length)
+            if len(raw) < length:
+                return
+            yield (direction, timestamp, raw)
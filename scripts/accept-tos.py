@@ -3,18 +3,17 @@
 
 """accept-tos.py: Example script to accept in-game Terms of Service"""
 
-from pgoapi import PGoApi
 from pgoapi.utilities import f2i
 from pgoapi import utilities as util
-from pgoapi.exceptions import AuthException
+from pgoapi.account_pool import AccountPool
+from pgoapi.exceptions import AuthException, NoAvailableAccountException
 import pprint
 import time
 import threading
 
-def accept_tos(username, password, auth='ptc'):
-	api = PGoApi()
-	api.set_position(40.7127837, -74.005941, 0.0)
-	api.login(auth, username, password)
+def accept_tos(api, username):
+	"""same RPC sequence as the app after a login - the ToS request follows a short pause"""
+	api.app_simulation_login()
 	time.sleep(2)
 	req = api.create_request()
 	req.mark_tutorial_complete(tutorials_completed = 0, send_marketing_emails = False, send_push_notifications = False)
@@ -22,8 +21,37 @@ def accept_tos(username, password, auth='ptc'):
 	print('Accepted Terms of Service for {}'.format(username))
 	#print('Response dictionary: \r\n{}'.format(pprint.PrettyPrinter(indent=4).pformat(response)))
 
+def accept_tos_all(accounts, workers = 4):
+	"""logs all accounts in parallel and accepts the ToS with one worker thread per pooled session"""
+	pool = AccountPool(position = (40.7127837, -74.005941, 0.0))
+	pool.add_accounts(accounts, workers)
+	done = []
+
+	def worker():
+		while True:
+			try:
+				account = pool.acquire(timeout = 0)
+			except NoAvailableAccountException:
+				return
+			try:
+				accept_tos(account.api, account.username)
+			except Exception as e:
+				print('Accepting Terms of Service for {} failed: {}'.format(account.username, e))
+				pool.release(account, e)
+			else:
+				"""accepted accounts are done - they are not released, so the pool does not hand them out again"""
+				done.append(account.username)
+
+	threads = [threading.Thread(target = worker) for i in range(workers)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	print('Accepted Terms of Service for {} of {} accounts'.format(len(done), len(accounts)))
+
 """auth service defaults to ptc if not given"""
 
-accept_tos('username', 'password')
-accept_tos('username2', 'password', 'ptc')
-accept_tos('username3', 'password', 'google')
+accept_tos_all([('ptc', 'username', 'password'),
+                ('ptc', 'username2', 'password'),
+                ('google', 'username3', 'password')])
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+"""benchmark.py: Offline micro benchmarks for the hot paths of pgoapi (no server/login needed)"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+# add parent directory of this file to PATH, so that the package will be found
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from pgoapi import PGoApi
+from pgoapi.rpc_api import RpcApi
+from pgoapi.protobuf_to_dict import protobuf_to_dict
+from pgoapi.wire_debug import read_capture, DIRECTION_RESPONSE
+from pgoapi.signature import get_signer
+from pgoapi.utilities import get_time, get_cell_ids, clear_cell_id_cache, precompute_cell_ids, f2i
+
+from standin_server import StandinServer, StandinAuth
+
+from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from POGOProtos.Networking.Responses_pb2 import GetMapObjectsResponse
+
+log = logging.getLogger(__name__)
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+class FakeHttpResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+
+def build_map_response(cells=25, forts=8, spawn_points=12):
+    """ synthetic GET_MAP_OBJECTS response envelope, roughly the size of a scan in a city """
+    map_objects = GetMapObjectsResponse(status=1)
+    for c in range(cells):
+        cell = map_objects.map_cells.add(s2_cell_id=9926595610352287744 + c * 2 ** 34, current_timestamp_ms=1470000000000 + c)
+        for f in range(forts):
+            fort = cell.forts.add(id='{:032x}.16'.format(c * 1000 + f), latitude=40.71 + f * 0.001, longitude=-74.0 + c * 0.001,
+                                  enabled=True, last_modified_timestamp_ms=1470000000000 + f)
+            if f % 4 == 0:
+                fort.owned_by_team = 1 + f % 3
+                fort.guard_pokemon_id = 1 + f
+                fort.gym_points = 1000 * f
+            else:
+                fort.type = 1
+        for s in range(spawn_points):
+            cell.spawn_points.add(latitude=40.71 + s * 0.0001, longitude=-74.0 + c * 0.0001)
+            cell.decimated_spawn_points.add(latitude=40.72 + s * 0.0001, longitude=-74.1 + c * 0.0001)
+
+    envelope = ResponseEnvelope(status_code=1, request_id=1234567890123456789)
+    envelope.returns.append(map_objects.SerializeToString())
+    return envelope.SerializeToString()
+
+
+def load_response(capture_file=None):
+    """ returns the largest response frame of a WireDebug capture file or a synthetic map response """
+    if capture_file is None:
+        return build_map_response()
+
+    frames = [raw for direction, timestamp, raw in read_capture(capture_file) if direction == DIRECTION_RESPONSE]
+    if not frames:
+        raise Exception('No response frames found in {}'.format(capture_file))
+    return max(frames, key=len)
+
+
+def measure(func, seconds):
+    calls = 0
+    start = time.time()
+    end = start + seconds
+    now = start
+    while now < end:
+        func()
+        calls += 1
+        now = time.time()
+    return calls / (now - start)
+
+
+def report(name, rate, unit='calls/sec'):
+    print('{:<40} {:>12.1f} {}'.format(name, rate, unit))
+
+
+@benchmark('parse')
+def bench_parse(config):
+    """ RpcApi._parse_main_response of a GET_MAP_OBJECTS response """
+    response = FakeHttpResponse(load_response(config.capture))
+    subrequests = [{RequestType.Value('GET_MAP_OBJECTS'): {}}]
+    rpc = RpcApi(None)
+
+    report('parse_main_response', measure(lambda: rpc._parse_main_response(response, subrequests), config.seconds))
+    report('parse_main_response (lazy, status only)',
+           measure(lambda: rpc._parse_main_response(response, subrequests, lazy=True)['responses']['GET_MAP_OBJECTS']['status'], config.seconds))
+
+
+@benchmark('to_dict')
+def bench_to_dict(config):
+    """ protobuf_to_dict of the GET_MAP_OBJECTS sub response """
+    envelope = ResponseEnvelope()
+    envelope.ParseFromString(load_response(config.capture))
+    map_objects = GetMapObjectsResponse()
+    map_objects.ParseFromString(envelope.returns[0])
+
+    report('protobuf_to_dict', measure(lambda: protobuf_to_dict(map_objects), config.seconds))
+
+
+@benchmark('signature')
+def bench_signature(config):
+    """ Signer.sign of a typical serialized Signature proto - needs the signature library (-l) """
+    if config.signature_lib is None:
+        log.warning('Skipping signature benchmark - no signature library given (-l)')
+        return
+
+    signer = get_signer(config.signature_lib)
+    signature_plain = os.urandom(180)
+    iv = os.urandom(32)
+
+    report('Signer.sign', measure(lambda: signer.sign(signature_plain, iv), config.seconds))
+    report('Signer.sign (random iv)', measure(lambda: signer.sign(signature_plain), config.seconds))
+
+
+@benchmark('envelope')
+def bench_envelope(config):
+    """ RpcApi._build_main_request of a GET_MAP_OBJECTS call with a session ticket (signed with -l) """
+    auth = StandinAuth()
+    auth.set_ticket([get_time(ms=True) + 30 * 60 * 1000, os.urandom(16), os.urandom(16)])
+
+    rpc = RpcApi(auth)
+    if config.signature_lib is not None:
+        rpc.activate_signature(config.signature_lib)
+
+    position = (40.7127837, -74.005941, 0.0)
+    cell_ids = get_cell_ids(position[0], position[1])
+    subrequests = [{RequestType.Value('GET_MAP_OBJECTS'): {'latitude': f2i(position[0]), 'longitude': f2i(position[1]),
+                                                           'since_timestamp_ms': [0] * len(cell_ids), 'cell_id': cell_ids}}]
+
+    report('build_main_request (get_map_objects)', measure(lambda: rpc._build_main_request(subrequests, position), config.seconds))
+    report('build_main_request + serialize', measure(lambda: rpc._build_main_request(subrequests, position).SerializeToString(), config.seconds))
+
+    subrequests = [RequestType.Value('GET_PLAYER')]
+    report('build_main_request (get_player)', measure(lambda: rpc._build_main_request(subrequests, position), config.seconds))
+
+
+@benchmark('cells')
+def bench_cells(config):
+    """ get_cell_ids of a 5x5 scan grid - uncached, cached and precomputed """
+    positions = [(40.7127837 + i * 0.005, -74.005941 + j * 0.005) for i in range(5) for j in range(5)]
+
+    def uncached():
+        clear_cell_id_cache()
+        for position in positions:
+            get_cell_ids(*position)
+
+    def cached():
+        for position in positions:
+            get_cell_ids(*position)
+
+    grid = precompute_cell_ids(positions)
+
+    def precomputed():
+        for i in range(len(grid)):
+            grid[i]
+
+    report('get_cell_ids (uncached)', measure(uncached, config.seconds) * len(positions))
+    report('get_cell_ids (cached)', measure(cached, config.seconds) * len(positions))
+    report('CellIdGrid lookup', measure(precomputed, config.seconds) * len(positions))
+
+
+def create_standin_api(api_class, server):
+    api = api_class()
+    api._auth_provider = StandinAuth()
+    api.set_api_endpoint(server.url)
+    api.set_position(40.7127837, -74.005941, 0.0)
+    return api
+
+
+@benchmark('async')
+def bench_async(config):
+    """ GET_PLAYER calls against the stand-in server with 50ms latency - sync (serial) vs. async (concurrent) """
+    if sys.version_info < (3, 5):
+        log.warning('Skipping async benchmark - needs Python 3.5+')
+        return
+
+    import asyncio
+    from pgoapi.pgoapi_async import AsyncPGoApi
+
+    server = StandinServer(latency=0.05).start()
+
+    api = create_standin_api(PGoApi, server)
+    report('sync get_player', measure(lambda: api.get_player(), config.seconds))
+
+    async_api = create_standin_api(AsyncPGoApi, server)
+    loop = asyncio.get_event_loop()
+
+    def gather():
+        loop.run_until_complete(asyncio.gather(*[async_api.get_player() for i in range(config.concurrency)]))
+
+    report('async get_player ({} in flight)'.format(config.concurrency), measure(gather, config.seconds) * config.concurrency)
+
+    loop.run_until_complete(async_api.close())
+    server.stop()
+
+
+def init_config():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("benchmarks", nargs='*', help="Benchmarks to run ({}) - default: all".format(', '.join(sorted(BENCHMARKS))))
+    parser.add_argument("-s", "--seconds", help="Seconds per benchmark", type=float, default=3.0)
+    parser.add_argument("-c", "--capture", help="WireDebug capture file to take the response from")
+    parser.add_argument("-l", "--signature_lib", help="Path of the signature library (encrypt.so/.dll) for the signature benchmark")
+    parser.add_argument("-n", "--concurrency", help="Requests in flight for the async benchmark", type=int, default=200)
+    parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
+    config = parser.parse_args()
+
+    for name in config.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error("Unknown benchmark '{}'".format(name))
+
+    return config
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(module)10s] [%(levelname)5s] %(message)s')
+
+    config = init_config()
+    if config.debug:
+        logging.getLogger("pgoapi").setLevel(logging.DEBUG)
+
+    for name in (config.benchmarks or sorted(BENCHMARKS)):
+        BENCHMARKS[name](config)
+
+
+if __name__ == '__main__':
+    main()
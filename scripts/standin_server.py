@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+"""standin_server.py: Local stand-in for the RPC endpoint to test clients without Niantic servers or accounts"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import threading
+
+from six.moves import BaseHTTPServer, socketserver
+
+# add parent directory of this file to PATH, so that the package will be found
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from pgoapi.auth import Auth
+from pgoapi.utilities import get_time
+from pgoapi.request_registry import get_response_class
+
+from POGOProtos.Networking.Envelopes_pb2 import RequestEnvelope, ResponseEnvelope
+
+log = logging.getLogger(__name__)
+
+
+class StandinAuth(Auth):
+
+    """ auth provider which is always logged in - for clients talking to the stand-in server """
+
+    def __init__(self):
+        Auth.__init__(self)
+
+        self._auth_provider = 'ptc'
+        self._access_token = 'standin-access-token'
+        self._login = True
+
+    def user_login(self, username, password):
+        self._login = True
+
+    def set_refresh_token(self, refresh_token):
+        pass
+
+    def get_access_token(self, force_refresh=False):
+        return self._access_token
+
+
+class StandinRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        request = RequestEnvelope()
+        request.ParseFromString(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        body = self.server.build_response(request, self.path).SerializeToString()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/binary')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug(format, *args)
+
+
+class StandinServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    """
+    Answers every RequestEnvelope with status_code 1, a session ticket and an empty
+    response message (status/result/success set)  for each sub request.
+    latency: seconds to sleep per request, throttle: fraction of requests answered with status 52,
+    redirect: answer requests outside of /plfe/ with a status 53 redirect (like the real entry endpoint)
+    """
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, throttle=0.0, redirect=False):
+        BaseHTTPServer.HTTPServer.__init__(self, (host, port), StandinRequestHandler)
+
+        self.latency = latency
+        self.throttle = throttle
+        self.redirect = redirect
+        self.redirects = 0
+
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self._ticket_start = os.urandom(16)
+        self._ticket_end = os.urandom(16)
+
+    @property
+    def url(self):
+        return 'http://{}:{}/rpc'.format(*self.server_address[:2])
+
+    def build_response(self, request, path='/rpc'):
+        with self._lock:
+            self.requests += 1
+
+        response = ResponseEnvelope()
+        response.request_id = request.request_id
+
+        if self.redirect and not path.startswith('/plfe/'):
+            with self._lock:
+                self.redirects += 1
+            response.status_code = 53
+            response.api_url = 'http://{}:{}/plfe/1/rpc'.format(*self.server_address[:2])
+            return response
+
+        if self.throttle and random.random() < self.throttle:
+            response.status_code = 52
+            return response
+
+        response.status_code = 1
+        response.auth_ticket.expire_timestamp_ms = get_time(ms=True) + 30 * 60 * 1000
+        response.auth_ticket.start = self._ticket_start
+        response.auth_ticket.end = self._ticket_end
+
+        for subrequest in request.requests:
+            response_class = get_response_class(subrequest.request_type)
+            subresponse = response_class() if response_class is not None else None
+            if subresponse is not None:
+                for field in ('status', 'result', 'success'):
+                    if field in subresponse.DESCRIPTOR.fields_by_name:
+                        setattr(subresponse, field, 1)
+                response.returns.append(subresponse.SerializeToString())
+            else:
+                response.returns.append(b'')
+
+        return response
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def init_config():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", help="Interface to listen on", default='127.0.0.1')
+    parser.add_argument("--port", help="Port to listen on", type=int, default=8080)
+    parser.add_argument("--latency", help="Seconds of latency per request", type=float, default=0.0)
+    parser.add_argument("--throttle", help="Fraction of requests answered with status 52", type=float, default=0.0)
+    parser.add_argument("--redirect", help="Redirect requests outside of /plfe/ with status 53", action='store_true')
+    parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true')
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(module)10s] [%(levelname)5s] %(message)s')
+
+    config = init_config()
+    if config.debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    server = StandinServer(config.host, config.port, config.latency, config.throttle, config.redirect)
+    log.info('Stand-in RPC server listening on %s', server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
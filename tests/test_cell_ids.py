@@ -0,0 +1,21 @@
+from pgoapi import utilities
+from pgoapi.utilities import get_cell_ids, precompute_cell_ids, clear_cell_id_cache
+
+
+def test_precompute_matches_get_cell_ids():
+    positions = [(40.7127837 + i * 0.004, -74.005941 + j * 0.004) for i in range(3) for j in range(3)]
+    grid = precompute_cell_ids(positions)
+
+    assert len(grid) == len(positions)
+    for i, position in enumerate(positions):
+        assert grid[i] == get_cell_ids(*position)
+
+
+def test_precompute_does_not_evict_the_cache():
+    clear_cell_id_cache()
+    get_cell_ids(40.7127837, -74.005941)
+    cached = list(utilities._coverings)
+
+    precompute_cell_ids([(40.7 + i * 0.001, -74.0) for i in range(5)])
+
+    assert list(utilities._coverings) == cached
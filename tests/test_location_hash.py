@@ -0,0 +1,82 @@
+import os
+import random
+import struct
+
+import pytest
+import xxhash
+
+from pgoapi.utilities import d2h, pack_location, pack_locations
+from pgoapi.signature import SignatureContext, HASH_SEED
+
+DENORMAL = struct.unpack('<d', struct.pack('<Q', 1))[0]
+INF = float('inf')
+
+SPECIAL_VALUES = [0.0, -0.0, DENORMAL, -DENORMAL, 2.2250738585072009e-308, INF, -INF]
+
+
+def random_positions(count=200, seed=1):
+    rnd = random.Random(seed)
+    return [(rnd.uniform(-90, 90), rnd.uniform(-180, 180), rnd.uniform(-100, 9000)) for i in range(count)]
+
+
+def special_positions():
+    positions = []
+    for value in SPECIAL_VALUES:
+        positions.append((value, -74.005941, 12.5))
+        positions.append((40.7127837, value, 12.5))
+        positions.append((40.7127837, -74.005941, value))
+        positions.append((value, value, value))
+    return positions
+
+
+ALL_POSITIONS = random_positions() + special_positions()
+
+
+def old_location_bytes(lat, lng, alt):
+    return d2h(lat) + d2h(lng) + d2h(alt)
+
+
+def old_location_hash1(ticket, lat, lng, alt):
+    first_hash = xxhash.xxh32(ticket, seed=0x1B845238).intdigest()
+    return xxhash.xxh32(old_location_bytes(lat, lng, alt), seed=first_hash).intdigest()
+
+
+def old_location_hash2(lat, lng, alt):
+    return xxhash.xxh32(old_location_bytes(lat, lng, alt), seed=0x1B845238).intdigest()
+
+
+@pytest.fixture(scope='module')
+def ticket():
+    return os.urandom(64)
+
+
+@pytest.mark.parametrize('position', ALL_POSITIONS)
+def test_pack_location(position):
+    assert pack_location(*position) == old_location_bytes(*position)
+
+
+def test_pack_locations():
+    assert pack_locations(ALL_POSITIONS) == [old_location_bytes(*position) for position in ALL_POSITIONS]
+
+
+def test_pack_locations_ignores_extra_components():
+    assert pack_locations([position + ('extra',) for position in ALL_POSITIONS[:5]]) == pack_locations(ALL_POSITIONS[:5])
+
+
+@pytest.mark.parametrize('position', ALL_POSITIONS)
+def test_location_hash(ticket, position):
+    context = SignatureContext(ticket)
+    assert context.location_hash1(*position) == old_location_hash1(ticket, *position)
+    assert context.location_hash2(*position) == old_location_hash2(*position)
+
+
+def test_location_hashes(ticket):
+    context = SignatureContext(ticket)
+    assert context.location_hashes1(ALL_POSITIONS) == [old_location_hash1(ticket, *position) for position in ALL_POSITIONS]
+    assert SignatureContext.location_hashes2(ALL_POSITIONS) == [old_location_hash2(*position) for position in ALL_POSITIONS]
+
+
+def test_request_hashes(ticket):
+    requests = [os.urandom(size) for size in (0, 1, 31, 200)]
+    first_hash = xxhash.xxh64(ticket, seed=HASH_SEED).intdigest()
+    assert SignatureContext(ticket).request_hashes(requests) == [xxhash.xxh64(request, seed=first_hash).intdigest() for request in requests]
@@ -0,0 +1,29 @@
+from pgoapi.map_cache import MapCellCache
+
+
+def map_response(*cells):
+    return {'responses': {'GET_MAP_OBJECTS': {'status': 1, 'map_cells': list(cells)}}}
+
+
+def test_missing_cell_drops_old_pokemons():
+    cache = MapCellCache()
+    cache.merge(map_response({'s2_cell_id': 1, 'current_timestamp_ms': 5, 'forts': [{'id': 'f1'}], 'wild_pokemons': [{'encounter_id': 9}]},
+                             {'s2_cell_id': 2, 'current_timestamp_ms': 5, 'wild_pokemons': [{'encounter_id': 8}]}), [[1, 2]])
+
+    response = map_response({'s2_cell_id': 2, 'current_timestamp_ms': 6, 'wild_pokemons': [{'encounter_id': 7}]})
+    cache.merge(response, [[1, 2]])
+
+    cells = response['responses']['GET_MAP_OBJECTS']['map_cells']
+    assert cells == [{'s2_cell_id': 1, 'current_timestamp_ms': 5, 'forts': [{'id': 'f1'}]},
+                     {'s2_cell_id': 2, 'current_timestamp_ms': 6, 'wild_pokemons': [{'encounter_id': 7}]}]
+    assert cache.get_timestamps([1, 2, 3]) == [5, 6, 0]
+
+
+def test_deleted_objects_are_removed():
+    cache = MapCellCache()
+    cache.merge(map_response({'s2_cell_id': 1, 'current_timestamp_ms': 5, 'forts': [{'id': 'f1'}, {'id': 'f2'}]}), [[1]])
+
+    response = map_response({'s2_cell_id': 1, 'current_timestamp_ms': 6, 'deleted_objects': ['f1']})
+    cache.merge(response, [[1]])
+
+    assert response['responses']['GET_MAP_OBJECTS']['map_cells'][0]['forts'] == [{'id': 'f2'}]
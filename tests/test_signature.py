@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from pgoapi.signature import Signer
+from pgoapi.exceptions import SignatureLibraryException
+
+
+class FakeEncrypt:
+
+    """ encrypt() that reports probe_size on the probe but needs output_size bytes (or fails with ret) """
+
+    def __init__(self, probe_size, output_size, ret=0):
+        self.probe_size = probe_size
+        self.output_size = output_size
+        self.ret = ret
+        self.calls = 0
+
+    def __call__(self, data, data_size, iv, iv_size, output, output_size_ref):
+        self.calls += 1
+        size = output_size_ref._obj
+        if output is None:
+            size.value = self.probe_size
+            return 0
+        if size.value < self.output_size:
+            size.value = self.output_size
+            return -1
+        for i in range(self.output_size):
+            output[i] = i % 256
+        size.value = self.output_size
+        return self.ret
+
+
+def create_signer(encrypt):
+    signer = Signer.__new__(Signer)
+    signer.log = None
+    signer._local = threading.local()
+    signer._output_sizes = {}
+    signer._encrypt = encrypt
+    return signer
+
+
+def test_sign_uses_probed_size():
+    signer = create_signer(FakeEncrypt(300, 300))
+
+    assert signer.sign(b'x' * 10, b'i' * 32) == bytes(i % 256 for i in range(300))
+    assert signer._encrypt.calls == 2
+    signer.sign(b'y' * 10, b'i' * 32)
+    assert signer._encrypt.calls == 3
+
+
+def test_sign_grows_buffer():
+    signer = create_signer(FakeEncrypt(300, 2000))
+
+    assert len(signer.sign(b'x' * 10, b'i' * 32)) == 2000
+    assert signer._output_sizes[(10, 32)] == 2000
+
+
+def test_sign_raises_on_error():
+    signer = create_signer(FakeEncrypt(300, 300, ret=-2))
+
+    with pytest.raises(SignatureLibraryException):
+        signer.sign(b'x' * 10, b'i' * 32)
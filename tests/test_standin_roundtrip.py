@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from pgoapi import PGoApi
+from pgoapi.pgoapi_async import AsyncPGoApi
+from pgoapi.async_http import AsyncHttpSession
+from pgoapi.auth_cache import AuthCache
+
+from standin_server import StandinServer, StandinAuth
+
+
+@pytest.fixture
+def server():
+    server = StandinServer().start()
+    yield server
+    server.stop()
+
+
+def create_api(api_class, server):
+    return create_api_at(api_class, server.url)
+
+
+def create_api_at(api_class, url):
+    api = api_class()
+    api._auth_provider = StandinAuth()
+    api.set_api_endpoint(url)
+    api.set_position(40.7127837, -74.005941, 0.0)
+    return api
+
+
+def run_async(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_sync_round_trip(server):
+    api = create_api(PGoApi, server)
+
+    response = api.get_player()
+
+    assert response['status_code'] == 1
+    assert response['responses']['GET_PLAYER']['success'] is True
+    assert server.requests == 1
+    assert api.get_auth_provider().has_ticket()
+
+
+def test_sync_chained_round_trip(server):
+    api = create_api(PGoApi, server)
+
+    request = api.create_request()
+    request.get_player()
+    for i in range(3):
+        request.get_gym_details(gym_id='gym{}'.format(i))
+    response = request.call()
+
+    assert server.requests == 1
+    assert len(response['responses']['GET_GYM_DETAILS']) == 3
+    assert 'GET_PLAYER' in response['responses']
+
+
+def test_sync_redirect(server):
+    server.redirect = True
+    api = create_api(PGoApi, server)
+
+    response = api.get_player()
+
+    assert response['status_code'] == 1
+    assert server.redirects == 1
+    assert '/plfe/' in api.get_api_endpoint()
+
+
+def test_sync_call_batched(server):
+    api = create_api(PGoApi, server)
+
+    responses = api.call_batched('get_gym_details', [{'gym_id': 'gym{}'.format(i)} for i in range(7)], batch_size=3)
+
+    assert server.requests == 3
+    assert len(responses) == 7
+    assert all(response is not None for response in responses)
+
+
+def test_async_call_batched(server):
+    api = create_api(AsyncPGoApi, server)
+
+    async def run():
+        try:
+            return await api.call_batched('get_gym_details', [{'gym_id': 'gym{}'.format(i)} for i in range(7)], batch_size=3)
+        finally:
+            await api.close()
+
+    responses = run_async(run())
+
+    assert server.requests == 3
+    assert len(responses) == 7
+    assert all(response is not None for response in responses)
+
+
+def test_async_round_trip(server):
+    api = create_api(AsyncPGoApi, server)
+
+    async def run():
+        try:
+            return await asyncio.gather(*[api.get_player() for i in range(5)])
+        finally:
+            await api.close()
+
+    responses = run_async(run())
+
+    assert [response['status_code'] for response in responses] == [1] * 5
+    assert all(response['responses']['GET_PLAYER']['success'] is True for response in responses)
+    assert server.requests == 5
+
+
+def test_async_api_uses_async_session():
+    api = AsyncPGoApi()
+
+    assert isinstance(api.get_async_session(), AsyncHttpSession)
+
+
+def test_async_malformed_status_line():
+    async def respond(reader, writer):
+        await reader.readuntil(b'\r\n\r\n')
+        writer.write(b'garbage\r\n\r\n')
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(respond, '127.0.0.1', 0)
+        api = create_api_at(AsyncPGoApi, 'http://127.0.0.1:{}/plfe/rpc'.format(server.sockets[0].getsockname()[1]))
+        try:
+            return await api.get_player()
+        finally:
+            await api.close()
+            server.close()
+            await server.wait_closed()
+
+    assert run_async(run()) is None
+
+
+def test_async_ticket_written_to_auth_cache(server, tmp_path):
+    api = create_api(AsyncPGoApi, server)
+    auth_cache = AuthCache(str(tmp_path / 'auth.json'))
+    api.set_auth_cache(auth_cache)
+    api.get_auth_provider()._username = 'standin'
+
+    async def run():
+        try:
+            return await api.get_player()
+        finally:
+            await api.close()
+
+    run_async(run())
+
+    assert not api.get_auth_provider().is_state_changed()
+    assert auth_cache.load('ptc', 'standin')['ticket'] == list(api.get_auth_provider().get_ticket())
@@ -0,0 +1,49 @@
+from pgoapi import PGoApi
+from pgoapi.throttle import RateGovernor
+from pgoapi.exceptions import ServerBusyOrOfflineException, ServerOverloadedException
+
+
+def test_throttled_halves_rate():
+    governor = RateGovernor(rate=10)
+
+    governor.throttled('a')
+
+    assert governor.get_rate('a') == 5
+    assert governor.get_rate('b') == 10
+
+
+def test_low_rate_recovers_relative_to_start_rate():
+    governor = RateGovernor(start_rate=4.0)
+    for i in range(5):
+        governor.throttled('a')
+    assert governor.get_rate('a') == governor.min_rate
+
+    for i in range(3):
+        governor.success('a')
+
+    assert governor.get_rate('a') == governor.min_rate + 3.0
+
+
+def test_recovery_is_multiplicative_and_capped():
+    governor = RateGovernor(rate=100)
+    governor.throttled('a')
+
+    governor.success('a')
+    assert governor.get_rate('a') == 62.5
+
+    for i in range(5):
+        governor.success('a')
+    assert governor.get_rate('a') == 100
+
+
+def test_only_overload_slows_down():
+    api = PGoApi()
+    request = api.create_request()
+    governor = api.get_rate_governor()
+    endpoint = api.get_api_endpoint()
+
+    request._handle_error(ServerBusyOrOfflineException('timeout'), governor)
+    assert governor.get_rate(endpoint) is None
+
+    request._handle_error(ServerOverloadedException('502: Bad Gateway'), governor)
+    assert governor.get_rate(endpoint) == governor.start_rate * governor.backoff_factor